@@ -5,6 +5,8 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from sqlalchemy.orm import DeclarativeBase
 from werkzeug.middleware.proxy_fix import ProxyFix
+from json_provider import FastJSONProvider
+from db_routing import RoutingSession, init_routing, replica_binds
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
@@ -12,12 +14,13 @@ logging.basicConfig(level=logging.DEBUG)
 class Base(DeclarativeBase):
     pass
 
-db = SQLAlchemy(model_class=Base)
+db = SQLAlchemy(model_class=Base, session_options={'class_': RoutingSession})
 
 # Create the app
 app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-production")
 app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
+app.json = FastJSONProvider(app)
 
 # Configure CORS for production deployment
 CORS(app, resources={
@@ -28,29 +31,84 @@ CORS(app, resources={
     }
 })
 
-# Configure the database - Force SQLite for development
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///portfolio.db"  # Explicitly set to SQLite
+# Configure the database - SQLite for development unless DATABASE_URL is set
+app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///portfolio.db")
 app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
     "pool_recycle": 300,
     "pool_pre_ping": True,
 }
 
+# Optional read replicas (db_routing.py): GET requests read from them, writes go to the primary
+app.config["SQLALCHEMY_BINDS"] = replica_binds(os.environ.get("DATABASE_REPLICA_URLS"))
+app.config['DB_STICKY_SECONDS'] = int(os.environ.get('DB_STICKY_SECONDS', 5))  # primary reads after a write
+app.config['DB_REPLICA_RETRY_SECONDS'] = int(os.environ.get('DB_REPLICA_RETRY_SECONDS', 30))
+app.config['DB_REPLICA_CHECK_SECONDS'] = int(os.environ.get('DB_REPLICA_CHECK_SECONDS', 10))
+
 # Production optimizations
 app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 31536000  # 1 year cache for static files
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max upload
 app.config['TEMPLATES_AUTO_RELOAD'] = False
 app.config['EXPLAIN_TEMPLATE_LOADING'] = False
 
+# Token for the owner-only endpoints such as /api/contacts
+app.config['ADMIN_API_TOKEN'] = os.environ.get('ADMIN_API_TOKEN')
+
+# Contact notification digest: batch new submissions into one owner email
+app.config['CONTACT_DIGEST_ENABLED'] = os.environ.get('CONTACT_DIGEST_ENABLED', '').lower() in ('1', 'true', 'yes')
+app.config['CONTACT_DIGEST_WINDOW'] = int(os.environ.get('CONTACT_DIGEST_WINDOW', 900))  # seconds
+app.config['CONTACT_DIGEST_MAX'] = int(os.environ.get('CONTACT_DIGEST_MAX', 20))
+
+# Per-worker read cache, kept coherent across workers by data_version.py
+app.config['READ_CACHE_TTL'] = int(os.environ.get('READ_CACHE_TTL', 300))  # seconds, 0 disables
+app.config['DATA_VERSION_PATH'] = os.environ.get('DATA_VERSION_PATH')  # default: instance/data_version
+
+# Request profiling (profiler.py): signed X-Profile header and/or random sampling
+app.config['PROFILE_SECRET'] = os.environ.get('PROFILE_SECRET')
+app.config['PROFILE_SAMPLE_RATE'] = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))  # fraction of requests
+app.config['PROFILE_INTERVAL_MS'] = float(os.environ.get('PROFILE_INTERVAL_MS', 1))
+app.config['PROFILE_DIR'] = os.environ.get('PROFILE_DIR')  # default: instance/profiles
+app.config['PROFILE_KEEP'] = int(os.environ.get('PROFILE_KEEP', 50))
+
+# Contact spam filter (spam_filter.py): suspected spam is stored as 'held' and never emailed
+app.config['SPAM_FILTER_ENABLED'] = os.environ.get('SPAM_FILTER_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+app.config['SPAM_THRESHOLD'] = float(os.environ.get('SPAM_THRESHOLD', 0.9))  # spam probability
+app.config['SPAM_MIN_EXAMPLES'] = int(os.environ.get('SPAM_MIN_EXAMPLES', 20))  # labelled rows per class
+app.config['SPAM_MODEL_PATH'] = os.environ.get('SPAM_MODEL_PATH')  # default: instance/spam_model.npz
+app.config['SPAM_BATCH_SIZE'] = int(os.environ.get('SPAM_BATCH_SIZE', 64))
+app.config['SPAM_SCORER_THREADS'] = int(os.environ.get('SPAM_SCORER_THREADS', 2))
+
+# Delta sync log behind /api/changes (changes.py)
+app.config['CHANGES_SETTLE_SECONDS'] = float(os.environ.get('CHANGES_SETTLE_SECONDS', 2))  # max commit delay
+app.config['CHANGES_MAX_ENTRIES'] = int(os.environ.get('CHANGES_MAX_ENTRIES', 1000))  # beyond this, reset
+app.config['CHANGES_RETENTION_DAYS'] = int(os.environ.get('CHANGES_RETENTION_DAYS', 7))
+
 # Initialize the app with the extension
 db.init_app(app)
 
 with app.app_context():
     # Import models and routes
     import models
+    import data_version
+    init_routing(app, db)
     import routes
+    import contact_digest
+    import geo
+    import profiler
+    import service_worker
+    import freeze
+    import spam_filter
+    import changes
+    import client_hints
+    from schema import upgrade_schema
     
-    # Create all tables
+    # Create all tables, then add any columns/indexes newer than the database
     db.create_all()
+    upgrade_schema(db.engine, db.metadata)
+    models.backfill_timeline_durations()
+    if geo.geo_index_stale():
+        geo.rebuild_geo_index()
+    if app.config['SPAM_FILTER_ENABLED'] and not os.path.exists(spam_filter.model_path()):
+        spam_filter.train_and_save()
     
     # Initialize sample data if database is empty
     if not models.Project.query.first():
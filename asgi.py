@@ -0,0 +1,185 @@
+"""ASGI entry point with an async read path for the public API.
+
+GET/HEAD requests for the read-only collection endpoints in
+``queries.READ_ENDPOINTS`` (plus ``/api/social``) are answered on the event
+loop with SQLAlchemy's async engine, so slow clients and idle keep-alive
+connections cost a coroutine rather than a worker thread. Everything else
+is handed to the regular Flask app through asgiref's WSGI adapter.
+
+Responses are built with the same statements, serializers and Flask
+request hooks as the sync views, so both paths return identical bodies and
+headers. Run with:
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+"""
+import io
+import os
+import sys
+from urllib.parse import parse_qs
+
+from asgiref.wsgi import WsgiToAsgi
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from flask import request
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+from app import app, db
+from client_hints import api_variant, lite_payload
+from queries import READ_ENDPOINTS, social_feed
+from routes import read_cache, read_cache_key
+
+# Sync driver -> async driver for the URL the Flask app is configured with
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'sqlite+pysqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'postgresql+psycopg2': 'postgresql+asyncpg',
+}
+
+
+def async_database_url():
+    """Async URL for the app database, overridable with ASYNC_DATABASE_URL"""
+    if os.environ.get('ASYNC_DATABASE_URL'):
+        return os.environ['ASYNC_DATABASE_URL']
+    with app.app_context():
+        # db.engine.url has Flask-SQLAlchemy's instance-path fix-ups applied
+        url = db.engine.url
+    return url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername))
+
+
+def async_engine_options(url):
+    # aiosqlite otherwise opens a new connection (and thread) per checkout;
+    # a fixed pool keeps thousands of concurrent requests queued on a few
+    # connections instead.
+    options = {
+        'poolclass': AsyncAdaptedQueuePool,
+        'pool_size': int(os.environ.get('ASYNC_DB_POOL_SIZE', 10)),
+        'max_overflow': 0,
+        'pool_timeout': 30,
+    }
+    if not str(url).startswith('sqlite'):
+        options.update(pool_pre_ping=True, pool_recycle=300)
+    return options
+
+
+_async_url = async_database_url()
+async_engine = create_async_engine(_async_url, **async_engine_options(_async_url))
+AsyncSession = async_sessionmaker(async_engine, expire_on_commit=False)
+
+flask_asgi = WsgiToAsgi(app)
+
+
+async def fetch_read_endpoint(path, args):
+    """Async twin of routes.fetch_read_endpoint"""
+    if path == '/api/social':
+        return social_feed()
+    variant = api_variant()
+    key = read_cache_key(path, args, variant)
+    payload = read_cache.get(key)
+    if payload is None:
+        statement, shape = READ_ENDPOINTS[path]
+        async with AsyncSession() as session:
+            result = await session.execute(statement(args))
+            payload = shape(result.scalars().all())
+        if variant == 'lite':
+            payload = lite_payload(path, payload)
+        read_cache.set(key, payload)
+    return payload
+
+
+def build_environ(scope):
+    """Minimal WSGI environ for a body-less ASGI request.
+
+    Cheaper than app.test_request_context(), which runs the full
+    EnvironBuilder on every request.
+    """
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'],
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': (scope.get('client') or ('', 0))[0],
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for raw_name, raw_value in scope['headers']:
+        name = raw_name.decode('latin-1').upper().replace('-', '_')
+        value = raw_value.decode('latin-1')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = f'HTTP_{name}'
+        environ[name] = f'{environ[name]},{value}' if name in environ else value
+    return environ
+
+
+async def _send_response(send, response, include_body=True):
+    body = response.get_data()
+    await send({
+        'type': 'http.response.start',
+        'status': response.status_code,
+        'headers': [
+            (name.lower().encode('latin-1'), value.encode('latin-1'))
+            for name, value in response.headers.items()
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': body if include_body else b''})
+
+
+async def read_api(scope, receive, send):
+    """Serve one read-only API request on the async engine"""
+    environ = build_environ(scope)
+    # app.wsgi_app is wrapped in ProxyFix; apply the same X-Forwarded handling
+    environ = ProxyFix(lambda environ, start_response: environ, x_proto=1, x_host=1)(environ, None)
+    with app.request_context(environ):
+        # Run the same before/after request hooks as the Flask views
+        try:
+            response = app.preprocess_request()
+            if response is None:
+                payload = await fetch_read_endpoint(scope['path'], request.args)
+                response = app.json.response(payload)
+            else:
+                response = app.make_response(response)
+        except ValueError as e:
+            # Bad query arguments, reported the same way as the sync views
+            response = app.json.response({'error': str(e)})
+            response.status_code = 400
+        except Exception as e:
+            response = app.make_response(app.handle_exception(e))
+        response = app.process_response(response)
+    await _send_response(send, response, include_body=scope['method'] != 'HEAD')
+
+
+async def lifespan(scope, receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await async_engine.dispose()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+def _wants_ndjson(scope):
+    # ?format=ndjson streams from a server-side cursor in the sync view
+    return 'ndjson' in parse_qs(scope.get('query_string', b'').decode('latin-1')).get('format', ())
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(scope, receive, send)
+
+    path = scope.get('path')
+    if (scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD')
+            and (path in READ_ENDPOINTS or path == '/api/social')
+            and not _wants_ndjson(scope)):
+        return await read_api(scope, receive, send)
+
+    return await flask_asgi(scope, receive, send)
@@ -0,0 +1,24 @@
+"""Bearer-token protection for the owner-only API endpoints"""
+import hmac
+from functools import wraps
+
+from flask import jsonify, request
+
+from app import app
+
+
+def require_admin_token(view):
+    """Reject requests without ``Authorization: Bearer <ADMIN_API_TOKEN>``"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        token = app.config.get('ADMIN_API_TOKEN')
+        if not token:
+            return jsonify({'error': 'Admin API is not configured'}), 503
+
+        # Compare bytes: compare_digest rejects non-ASCII str with TypeError
+        scheme, _, supplied = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() != 'bearer' or not hmac.compare_digest(supplied.strip().encode(), token.encode()):
+            return jsonify({'error': 'Unauthorized'}), 401
+
+        return view(*args, **kwargs)
+    return wrapper
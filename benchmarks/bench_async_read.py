@@ -0,0 +1,129 @@
+"""Compare the sync (gunicorn) and async (uvicorn) read paths.
+
+Usage:
+    python benchmarks/bench_async_read.py [--concurrency 50,500,2000]
+        [--duration 10] [--workers 1] [--threads 8] [--idle 2000]
+        [--read-cache-ttl 0]
+
+Starts ``gunicorn main:app`` and ``uvicorn asgi:application`` on free
+local ports with the same number of processes, checks that every read
+endpoint returns identical bodies on both, then drives them with an
+increasing number of concurrent keep-alive clients. With ``--idle`` the
+active load runs while that many extra keep-alive connections sit open,
+which is where a thread-per-connection server runs out of workers.
+Both servers run with the read cache off by default, so the comparison
+covers the query path; pass ``--read-cache-ttl 300`` to measure cache hits.
+"""
+import argparse
+import asyncio
+import os
+import resource
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from loadgen import hold_idle, run_load
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+READ_PATHS = [
+    '/api/projects',
+    '/api/projects?featured=true',
+    '/api/skills',
+    '/api/testimonials',
+    '/api/timeline',
+    '/api/stats',
+    '/api/achievements',
+    '/api/social',
+]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(command, port, env):
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/api/stats', timeout=1).read()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f'server did not start: {" ".join(command)}')
+
+
+def fetch_all(port):
+    return {path: urllib.request.urlopen(f'http://127.0.0.1:{port}{path}').read() for path in READ_PATHS}
+
+
+async def measure(port, concurrency, duration, idle):
+    idle_writers = await hold_idle('127.0.0.1', port, '/api/stats', idle, timeout=10)
+    try:
+        return await run_load('127.0.0.1', port, READ_PATHS,
+                              concurrency=concurrency, duration=duration, timeout=10)
+    finally:
+        for writer in idle_writers:
+            writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--concurrency', default='50,500,2000')
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=8, help='gunicorn gthread threads per worker')
+    parser.add_argument('--idle', type=int, default=0, help='extra idle keep-alive connections held open')
+    parser.add_argument('--read-cache-ttl', type=int, default=0, help='READ_CACHE_TTL for both servers; 0 disables')
+    args = parser.parse_args()
+
+    # Thousands of client sockets need a raised file descriptor limit
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    env = dict(os.environ, READ_CACHE_TTL=str(args.read_cache_ttl))
+    sync_port, async_port = free_port(), free_port()
+    servers = {
+        'sync (gunicorn gthread)': (start_server([
+            sys.executable, '-m', 'gunicorn', 'main:app', '--bind', f'127.0.0.1:{sync_port}',
+            '--workers', str(args.workers), '--worker-class', 'gthread',
+            '--threads', str(args.threads), '--backlog', '4096',
+        ], sync_port, env), sync_port),
+        'async (uvicorn)': (start_server([
+            sys.executable, '-m', 'uvicorn', 'asgi:application', '--port', str(async_port),
+            '--workers', str(args.workers), '--log-level', 'warning', '--backlog', '4096',
+        ], async_port, env), async_port),
+    }
+
+    try:
+        sync_bodies, async_bodies = fetch_all(sync_port), fetch_all(async_port)
+        mismatched = [path for path in READ_PATHS if sync_bodies[path] != async_bodies[path]]
+        if mismatched:
+            raise SystemExit(f'Responses differ between sync and async paths: {mismatched}')
+        print(f'Responses identical on {len(READ_PATHS)} endpoints, READ_CACHE_TTL={args.read_cache_ttl}')
+        if args.idle:
+            print(f'Holding {args.idle} idle keep-alive connections during each run')
+        print()
+
+        print(f'{"server":<26} {"clients":>7} {"req/s":>9} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"errors":>7}')
+        for concurrency in (int(c) for c in args.concurrency.split(',')):
+            for label, (_, port) in servers.items():
+                summary = asyncio.run(measure(port, concurrency, args.duration, args.idle)).summary()
+                print(f'{label:<26} {concurrency:>7} {summary["throughput"]:>9.0f} '
+                      f'{summary["p50_ms"]:>8.1f} {summary["p95_ms"]:>8.1f} '
+                      f'{summary["p99_ms"]:>8.1f} {summary["errors"]:>7}')
+    finally:
+        for process, _ in servers.values():
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
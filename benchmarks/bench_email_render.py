@@ -0,0 +1,63 @@
+"""Microbenchmark for rendering contact emails from the precompiled templates.
+
+Usage:
+    python benchmarks/bench_email_render.py [--messages 20000] [--send-latency-ms 150]
+
+Reports the render cost per message for the owner notification and the
+auto-reply, and what share of a typical provider round trip that represents.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from email_service import contact_context, render_email
+
+
+def sample_contact(i):
+    return {
+        'name': f'Visitor {i} <script>alert(1)</script>',
+        'email': f'visitor{i}@example.com',
+        'subject': f'Project enquiry #{i} & "quotes"',
+        'message': 'Hi Kavya,\n\nI would love to talk about a project. ' * 8,
+    }
+
+
+def bench(label, template_name, contexts, send_latency_ms):
+    # First render compiles the templates; keep it out of the measurement.
+    render_email(template_name, **contexts[0])
+
+    start = time.perf_counter()
+    for context in contexts:
+        render_email(template_name, **context)
+    elapsed = time.perf_counter() - start
+
+    per_message_us = elapsed / len(contexts) * 1e6
+    share = per_message_us / (send_latency_ms * 1000) * 100
+    print(f'{label:<22} {per_message_us:9.1f} us/message  '
+          f'{len(contexts) / elapsed:10.0f} msg/s  '
+          f'{share:6.3f}% of a {send_latency_ms:g} ms send')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=20000)
+    parser.add_argument('--send-latency-ms', type=float, default=150.0,
+                        help='reference provider round trip used for the share column')
+    args = parser.parse_args()
+
+    contacts = [sample_contact(i) for i in range(args.messages)]
+    submission_time = 'January 01, 2025 at 09:00 AM'
+
+    bench('contact_notification', 'contact_notification',
+          [contact_context(c, submission_time=submission_time) for c in contacts],
+          args.send_latency_ms)
+    bench('auto_reply', 'auto_reply',
+          [contact_context(c) for c in contacts],
+          args.send_latency_ms)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Email throughput benchmark against the local SMTP sink.
+
+Usage:
+    python benchmarks/bench_email_throughput.py [--messages 2000] [--clients 16]
+        [--pool-sizes 1,2,4,8] [--latency-ms 5]
+
+Sends auto-replies from concurrent client threads through EmailService and
+the SMTP transport, once with a fresh connection per message and then with
+pooled keep-alive connections at each pool size, so the pool size and
+concurrency limit can be tuned without a live provider.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from email_service import EmailService
+from email_transport import SMTPTransport
+from smtp_sink import SMTPSink
+
+
+def run(label, sink, transport, messages, clients):
+    service = EmailService(transport=transport)
+    contacts = [{
+        'name': f'Visitor {i}',
+        'email': f'visitor{i}@example.com',
+        'subject': f'Enquiry #{i}',
+    } for i in range(messages)]
+
+    before = sink.messages
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(service.send_auto_reply, contacts))
+    elapsed = time.perf_counter() - start
+    transport.close()
+
+    failures = sum(1 for result in results if not result.get('success'))
+    delivered = sink.messages - before
+    print(f'{label:<28} {delivered / elapsed:9.0f} msg/s  '
+          f'{elapsed / messages * 1000:7.2f} ms/msg  '
+          f'delivered={delivered} failures={failures}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--pool-sizes', default='1,2,4,8')
+    parser.add_argument('--latency-ms', type=float, default=5,
+                        help='per-message delay injected by the SMTP sink')
+    args = parser.parse_args()
+
+    sink = SMTPSink(latency_ms=args.latency_ms).start()
+    try:
+        pool_sizes = [int(size) for size in args.pool_sizes.split(',')]
+        run(f'no keep-alive (limit {max(pool_sizes)})', sink,
+            SMTPTransport('127.0.0.1', sink.port, pool_size=max(pool_sizes), keep_alive=False),
+            args.messages, args.clients)
+        for size in pool_sizes:
+            run(f'keep-alive pool={size}', sink,
+                SMTPTransport('127.0.0.1', sink.port, pool_size=size),
+                args.messages, args.clients)
+    finally:
+        sink.stop()
+
+
+if __name__ == '__main__':
+    main()
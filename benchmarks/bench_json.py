@@ -0,0 +1,86 @@
+"""Microbenchmark: Flask's default JSON provider vs FastJSONProvider.
+
+Usage:
+    python benchmarks/bench_json.py [--projects 1000,10000,50000] [--repeat 5]
+
+Builds /api/projects payloads of increasing size and times producing the
+response body both ways: the old path (isoformat() in the serializer,
+then json.dumps via DefaultJSONProvider) and the new one (datetimes left
+to the provider, orjson when available). Also checks that both bodies
+decode to the same data.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+import json_provider
+from json_provider import FastJSONProvider
+
+
+def project_rows(count):
+    now = datetime(2025, 1, 1, 12, 0, 0, 123456)
+    return [{
+        'id': i,
+        'title': f'Project {i}',
+        'description': 'A multi-language compiler platform with real-time compilation. ' * 3,
+        'tech_stack': ['Python', 'Flask', 'JavaScript', 'Docker'],
+        'github_url': f'https://github.com/example/project-{i}',
+        'live_url': '#',
+        'image_url': '/static/assets/images/projects/love-compiler.svg',
+        'category': 'Full Stack',
+        'featured': i % 5 == 0,
+        'created_at': now - timedelta(minutes=i),
+    } for i in range(count)]
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--projects', default='1000,10000,50000')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    default_provider = DefaultJSONProvider(app)
+    fast_provider = FastJSONProvider(app)
+    backend = 'orjson' if json_provider.orjson is not None else 'stdlib json'
+    print(f'FastJSONProvider backend: {backend}\n')
+    print(f'{"projects":>9} {"default ms":>11} {"fast ms":>9} {"speedup":>8} {"body KiB":>9}')
+
+    for count in (int(c) for c in args.projects.split(',')):
+        rows = project_rows(count)
+
+        def old_path():
+            payload = [dict(row, created_at=row['created_at'].isoformat()) for row in rows]
+            return default_provider.response(payload).get_data()
+
+        def new_path():
+            return fast_provider.response(rows).get_data()
+
+        with app.app_context():
+            if json.loads(old_path()) != json.loads(new_path()):
+                raise SystemExit('payload mismatch between providers')
+            size = len(new_path())
+            old = best_of(args.repeat, old_path)
+            new = best_of(args.repeat, new_path)
+        print(f'{count:>9} {old * 1000:>11.2f} {new * 1000:>9.2f} {old / new:>7.1f}x {size / 1024:>9.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Microbenchmark: request latency with the profiler off, sampled, and always on.
+
+Usage:
+    python benchmarks/bench_profiler.py [--scale 10000] [--requests 200]
+        [--rates 0,0.01,0.1,1] [--interval-ms 1]
+
+Each rate runs in a fresh process (the profiler is installed at import) on
+a database seeded with benchmarks/seed.py. The read cache is disabled so
+every request hits the database. Mean and p95 latency over the test client
+show what a production sample rate costs.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+
+PATHS = ['/api/projects?featured=true', '/api/timeline', '/api/testimonials/geo?zoom=4']
+
+
+def child(scale, count):
+    sys.path[:0] = [ROOT, BENCH_DIR]
+    import logging
+    from app import app, db
+    from models import Project
+    logging.disable(logging.INFO)
+
+    with app.app_context():
+        if db.session.query(Project).count() < scale:
+            from seed import seed_database
+            seed_database(scale)
+
+    client = app.test_client()
+    timings = []
+    for i in range(count):
+        path = PATHS[i % len(PATHS)]
+        start = time.perf_counter()
+        client.get(path).close()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    mean = sum(timings) / len(timings)
+    print(f'{mean * 1000:.2f} {timings[int(len(timings) * 0.95)] * 1000:.2f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, default=10000)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--rates', default='0,0.01,0.1,1')
+    parser.add_argument('--interval-ms', default='1')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return child(args.scale, args.requests)
+
+    workdir = tempfile.mkdtemp(prefix='portfolio-profiler-')
+    print(f'{"rate":>6} {"mean ms":>9} {"p95 ms":>9}')
+    for rate in args.rates.split(','):
+        env = dict(
+            os.environ,
+            DATABASE_URL=f'sqlite:///{os.path.join(workdir, "bench.db")}',
+            READ_CACHE_TTL='0',
+            PROFILE_SAMPLE_RATE=rate,
+            PROFILE_INTERVAL_MS=args.interval_ms,
+            PROFILE_DIR=os.path.join(workdir, 'profiles'),
+        )
+        output = subprocess.run(
+            [sys.executable, __file__, '--child', '--scale', str(args.scale), '--requests', str(args.requests)],
+            cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+        ).stdout.split()
+        print(f'{rate:>6} {output[-2]:>9} {output[-1]:>9}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Microbenchmark: contact spam scoring cost per message, alone and under concurrent load.
+
+Usage:
+    python benchmarks/bench_spam.py [--train 2000] [--messages 4000]
+        [--concurrency 1,4,16,64]
+
+Trains the spam_filter.py model on synthetic labelled messages. It then times
+feature hashing and model scoring one message at a time, and scoring through
+the micro-batching thread pool with N submitting threads (the way
+concurrent /api/contact requests use it). "per msg" is wall time divided by
+messages scored. p50/p99 are the latency each submitter saw.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+
+SPAM_WORDS = 'casino crypto bitcoin winner prize seo backlinks cheap loan offer click free money guaranteed'.split()
+HAM_WORDS = 'project role interview collaboration portfolio research paper team question python data meeting'.split()
+COMMON_WORDS = 'the a your we to and for with this you'.split()
+
+
+def message(spam, rng):
+    words = ' '.join(rng.choice(SPAM_WORDS if spam else HAM_WORDS + COMMON_WORDS) for _ in range(rng.randint(15, 80)))
+    if spam:
+        return {'name': 'Promo Team', 'email': f'deals{rng.randint(0, 999)}@offers.biz', 'subject': 'FREE offer',
+                'message': f'{words} http://offers.biz/{rng.randint(0, 9999)}'}
+    return {'name': 'Jane Doe', 'email': f'jane{rng.randint(0, 999)}@example.edu', 'subject': 'Hello',
+            'message': words}
+
+
+def percentile(timings, fraction):
+    return timings[min(int(len(timings) * fraction), len(timings) - 1)] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--train', type=int, default=2000)
+    parser.add_argument('--messages', type=int, default=4000)
+    parser.add_argument('--concurrency', default='1,4,16,64')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='portfolio-spam-')
+    os.environ.setdefault('DATABASE_URL', f'sqlite:///{os.path.join(workdir, "bench.db")}')
+    os.environ['SPAM_MODEL_PATH'] = os.path.join(workdir, 'spam_model.npz')
+    sys.path.insert(0, ROOT)
+    import logging
+    from app import app
+    from spam_filter import BatchScorer, SpamModel, contact_features
+    logging.disable(logging.INFO)
+
+    rng = random.Random(7)
+    training = [(message(i % 2 == 0, rng), i % 2 == 0) for i in range(args.train)]
+    docs = [(contact_features(m['name'], m['email'], m['subject'], m['message']), spam) for m, spam in training]
+    start = time.perf_counter()
+    model = SpamModel.train([f for f, spam in docs if spam], [f for f, spam in docs if not spam])
+    print(f'trained on {args.train} messages in {(time.perf_counter() - start) * 1000:.1f} ms')
+
+    samples = [message(rng.random() < 0.5, rng) for _ in range(args.messages)]
+    start = time.perf_counter()
+    features = [contact_features(m['name'], m['email'], m['subject'], m['message']) for m in samples]
+    hashing = (time.perf_counter() - start) / len(samples)
+    start = time.perf_counter()
+    for f in features:
+        model.score_batch([f])
+    single = (time.perf_counter() - start) / len(samples)
+    print(f'feature hashing {hashing * 1000:.3f} ms/msg, unbatched scoring {single * 1000:.3f} ms/msg')
+
+    print(f'{"threads":>8} {"per msg ms":>11} {"p50 ms":>8} {"p99 ms":>8}')
+    for concurrency in (int(n) for n in args.concurrency.split(',')):
+        scorer = BatchScorer(app.config['SPAM_SCORER_THREADS'], app.config['SPAM_BATCH_SIZE'])
+        timings = []
+
+        def submitter(chunk):
+            for m in chunk:
+                begin = time.perf_counter()
+                scorer.submit(model, contact_features(m['name'], m['email'], m['subject'], m['message'])).result()
+                timings.append(time.perf_counter() - begin)
+
+        threads = [threading.Thread(target=submitter, args=(samples[i::concurrency],)) for i in range(concurrency)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        timings.sort()
+        print(f'{concurrency:>8} {elapsed / len(samples) * 1000:>11.3f} '
+              f'{percentile(timings, 0.5):>8.3f} {percentile(timings, 0.99):>8.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+"""Small asyncio HTTP/1.1 load generator used by the benchmarks.
+
+Opens ``concurrency`` keep-alive connections and has each one issue
+requests back to back, reconnecting whenever the server closes the
+connection (as gunicorn's sync workers do after every response). Requests
+that exceed ``timeout`` seconds count as errors. Records
+per-request latency, status and body size; understands Content-Length and
+chunked (streaming) responses.
+"""
+import asyncio
+import itertools
+import time
+from collections import namedtuple
+
+# A request to issue; plain path strings are shorthand for GET requests.
+# ``headers`` holds raw header lines, each ending in CRLF.
+Request = namedtuple('Request', 'method path body headers', defaults=('GET', '', b'', ''))
+
+
+class LoadResult:
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.statuses = {}
+        self.bytes_received = 0
+        self.elapsed = 0.0
+
+    @property
+    def requests(self):
+        return len(self.latencies)
+
+    @property
+    def throughput(self):
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, pct):
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    def summary(self):
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'throughput': round(self.throughput, 1),
+            'p50_ms': round(self.percentile(50) * 1000, 3),
+            'p95_ms': round(self.percentile(95) * 1000, 3),
+            'p99_ms': round(self.percentile(99) * 1000, 3),
+            'statuses': dict(self.statuses),
+        }
+
+
+async def _read_body(reader, headers):
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        size = 0
+        while True:
+            chunk_size = int((await reader.readline()).split(b';')[0].strip(), 16)
+            if chunk_size == 0:
+                # Trailer section ends with an empty line
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return size
+            await reader.readexactly(chunk_size + 2)
+            size += chunk_size
+    length = int(headers.get('content-length', 0))
+    if length:
+        await reader.readexactly(length)
+    return length
+
+
+async def fetch(reader, writer, host, request, extra_headers=''):
+    """Send one request on an open connection; returns (status, size, keep_alive)"""
+    if isinstance(request, str):
+        request = Request('GET', request)
+    head = f'{request.method} {request.path} HTTP/1.1\r\nHost: {host}\r\n{extra_headers}{request.headers}'
+    if request.body or request.method not in ('GET', 'HEAD'):
+        head += f'Content-Length: {len(request.body)}\r\n'
+    writer.write(head.encode('latin-1') + b'\r\n' + request.body)
+    await writer.drain()
+
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('connection closed by server')
+    status = int(status_line.split()[1])
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    size = await _read_body(reader, headers)
+    keep_alive = headers.get('connection', '').lower() != 'close'
+    return status, size, keep_alive
+
+
+async def _client(host, port, paths, deadline, remaining, result, extra_headers, timeout):
+    reader = writer = None
+    while time.perf_counter() < deadline and remaining():
+        try:
+            if writer is None:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+            path = next(paths)
+            start = time.perf_counter()
+            status, size, keep_alive = await asyncio.wait_for(
+                fetch(reader, writer, host, path, extra_headers), timeout
+            )
+            result.latencies.append(time.perf_counter() - start)
+            result.statuses[status] = result.statuses.get(status, 0) + 1
+            result.bytes_received += size
+            if not keep_alive:
+                writer.close()
+                writer = None
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError,
+                ValueError, IndexError):
+            result.errors += 1
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.01)
+    if writer is not None:
+        writer.close()
+
+
+async def run_load(host, port, paths, concurrency=50, duration=10.0, max_requests=None,
+                   extra_headers='', timeout=30.0):
+    """Drive ``paths`` (cycled paths or Requests) with ``concurrency`` clients; returns a LoadResult"""
+    result = LoadResult()
+    path_cycle = itertools.cycle(paths)
+    issued = itertools.count()
+
+    def remaining():
+        return max_requests is None or next(issued) < max_requests
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, path_cycle, start + duration, remaining, result, extra_headers, timeout)
+        for _ in range(concurrency)
+    ))
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+async def hold_idle(host, port, path, count, timeout=30.0):
+    """Open ``count`` keep-alive connections, make one request on each and
+    leave them idle. Returns the writers still open; close them when done."""
+    writers = []
+    for _ in range(count):
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+            _, _, keep_alive = await asyncio.wait_for(fetch(reader, writer, host, path), timeout)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            continue
+        if keep_alive:
+            writers.append(writer)
+        else:
+            writer.close()
+    return writers
+
+
+def load(host, port, paths, **kwargs):
+    """Synchronous wrapper around run_load"""
+    return asyncio.run(run_load(host, port, paths, **kwargs))
@@ -0,0 +1,342 @@
+"""Load-test every route at several dataset scales and compare with a baseline.
+
+Usage:
+    python benchmarks/run.py [--scales 1000,10000] [--concurrency 16]
+        [--duration 5] [--db-dir /tmp/portfolio-bench] [--output results.json]
+        [--baseline benchmarks/baseline.json] [--tolerance 0.25] [--update-baseline]
+
+For each scale a SQLite database is seeded once with benchmarks/seed.py and
+kept in ``--db-dir``. Every run works on a fresh copy of it, so writes from
+earlier runs never leak into later ones. A child process measures the peak
+Python memory allocated by one request to each route (tracemalloc), then
+serves the real Flask WSGI app on a threaded server. Routes that write
+(``WRITE_ROUTES``) are measured after every read route, so reads all see
+the seeded data. The parent drives every route with concurrent
+keep-alive clients and reports p50/p95/p99 latency, throughput and
+per-request memory. The per-worker read cache is disabled
+(``READ_CACHE_TTL=0``) so every request runs its queries.
+
+Results are compared with the stored baseline. Any route whose p95
+latency, throughput, memory or error count regressed beyond
+``--tolerance`` is reported and the run exits with status 1, as does any
+measured route missing from the baseline. The default scales are the ones
+stored in baseline.json; add 100000 for a longer run, with
+``--update-baseline`` the first time. Every route registered on the app must appear
+in ROUTES, or the run fails before measuring anything.
+"""
+import argparse
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from loadgen import Request, load
+
+ADMIN_TOKEN = 'bench-token'
+ADMIN = f'Authorization: Bearer {ADMIN_TOKEN}\r\n'
+JSON = 'Content-Type: application/json\r\n'
+LITE = 'Save-Data: on\r\n'
+
+# name -> request; covers every route in routes.py
+ROUTES = {
+    'index': Request('GET', '/'),
+    'dashboard': Request('GET', '/dashboard'),
+    'index_lite': Request('GET', '/', headers=LITE),
+    'service_worker': Request('GET', '/sw.js'),
+    'precache_manifest': Request('GET', '/precache-manifest.json'),
+    'projects': Request('GET', '/api/projects'),
+    'projects_featured': Request('GET', '/api/projects?featured=true'),
+    'projects_category': Request('GET', '/api/projects?category=AI%2FML'),
+    'projects_ndjson': Request('GET', '/api/projects?format=ndjson'),
+    'projects_lite': Request('GET', '/api/projects', headers=LITE),
+    'skills': Request('GET', '/api/skills'),
+    'testimonials': Request('GET', '/api/testimonials'),
+    'testimonials_ndjson': Request('GET', '/api/testimonials?format=ndjson'),
+    'testimonials_geo_bbox': Request('GET', '/api/testimonials/geo?bbox=-130,20,-60,55&limit=500'),
+    'testimonials_geo_near': Request('GET', '/api/testimonials/geo?near=40.71,-74.0&limit=20'),
+    'testimonials_geo_clusters': Request('GET', '/api/testimonials/geo?zoom=4'),
+    'timeline': Request('GET', '/api/timeline'),
+    'timeline_ndjson': Request('GET', '/api/timeline?format=ndjson'),
+    'timeline_active_at': Request('GET', '/api/timeline?active_at=2015-06-01'),
+    'timeline_overlap': Request('GET', '/api/timeline?from=2012-01-01&to=2012-12-31'),
+    'timeline_experience': Request('GET', '/api/timeline/experience'),
+    'stats': Request('GET', '/api/stats'),
+    'changes': Request('GET', '/api/changes?since=0'),
+    'achievements': Request('GET', '/api/achievements'),
+    'social': Request('GET', '/api/social'),
+    'contact_submit': Request('POST', '/api/contact', json.dumps({
+        'name': 'Bench Visitor', 'email': 'bench@example.com',
+        'subject': 'Benchmark', 'message': 'Load test message',
+    }).encode(), JSON),
+    'contacts_list': Request('GET', '/api/contacts?limit=50', headers=ADMIN),
+    'contacts_list_filtered': Request('GET', '/api/contacts?status=read&since=2024-12-01&limit=50', headers=ADMIN),
+    'contacts_status': Request('POST', '/api/contacts/status', json.dumps({
+        'status': 'read', 'ids': list(range(1, 51)),
+    }).encode(), JSON + ADMIN),
+    'contacts_export_ndjson': Request('GET', '/api/contacts/export?format=ndjson', headers=ADMIN),
+    'contacts_export_csv': Request('GET', '/api/contacts/export?format=csv', headers=ADMIN),
+    'download_source': Request('GET', '/download/source'),
+}
+# Routes that change the database; measured last so every read sees the seeded data
+WRITE_ROUTES = ('contact_submit', 'contacts_status')
+
+
+def measurement_order():
+    """ROUTES items with the write routes moved to the end"""
+    reads = [(name, request) for name, request in ROUTES.items() if name not in WRITE_ROUTES]
+    return reads + [(name, ROUTES[name]) for name in WRITE_ROUTES]
+
+
+# ---------------------------------------------------------------- child side
+
+def _headers_dict(raw):
+    headers = {}
+    for line in raw.split('\r\n'):
+        if line:
+            name, _, value = line.partition(':')
+            headers[name.strip()] = value.strip()
+    return headers
+
+
+def check_route_coverage(app):
+    """Return endpoints registered on the app that ROUTES never hits"""
+    adapter = app.url_map.bind('localhost')
+    covered = set()
+    for request in ROUTES.values():
+        endpoint, _ = adapter.match(request.path.split('?')[0], method=request.method)
+        covered.add(endpoint)
+    registered = {rule.endpoint for rule in app.url_map.iter_rules() if rule.endpoint != 'static'}
+    return sorted(registered - covered)
+
+
+def measure_memory(app):
+    """Peak bytes allocated while serving one request to each route"""
+    import tracemalloc
+
+    client = app.test_client()
+    peaks = {}
+    tracemalloc.start()
+    for name, request in measurement_order():
+        kwargs = {'method': request.method, 'headers': _headers_dict(request.headers)}
+        if request.body:
+            kwargs['data'] = request.body
+        client.open(request.path, **kwargs).close()  # warm caches and lazy imports
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        response = client.open(request.path, buffered=False, **kwargs)
+        for _ in response.iter_encoded():  # consume streamed bodies chunk by chunk
+            pass
+        response.close()
+        peaks[name] = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return peaks
+
+
+def seed(scale):
+    """Seed the database at DATABASE_URL with ``scale`` rows per main table"""
+    from app import app, db
+    from seed import seed_database
+
+    with app.app_context():
+        seed_database(scale)
+        db.session.remove()
+        db.engine.dispose()
+
+
+def serve(port, report_path):
+    import logging
+    from werkzeug.serving import make_server
+
+    from app import app, db
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    app.logger.setLevel(logging.WARNING)
+
+    with app.app_context():
+        missing = check_route_coverage(app)
+        memory = {} if missing else measure_memory(app)
+        db.session.remove()
+
+    # Write then rename so the parent never reads a half-written report
+    with open(f'{report_path}.tmp', 'w') as report:
+        json.dump({'missing_routes': missing, 'memory': memory}, report)
+    os.replace(f'{report_path}.tmp', report_path)
+    if missing:
+        return
+
+    make_server('127.0.0.1', port, app, threaded=True).serve_forever()
+
+
+# --------------------------------------------------------------- parent side
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def prepare_database(scale, args):
+    """Path of a fresh copy of the seeded database for ``scale``; the seeded file is never served"""
+    # Named apart from the served copy so databases written by older runs are never reused
+    seeded_path = os.path.join(args.db_dir, f'bench-{scale}.seeded.db')
+    if not os.path.exists(seeded_path):
+        seeding_path = f'{seeded_path}.seeding'
+        if os.path.exists(seeding_path):
+            os.remove(seeding_path)
+        subprocess.run(
+            [sys.executable, __file__, '--seed', str(scale)],
+            cwd=ROOT, env=dict(os.environ, DATABASE_URL=f'sqlite:///{seeding_path}'),
+            stdout=subprocess.DEVNULL, check=True,
+        )
+        os.replace(seeding_path, seeded_path)
+    db_path = os.path.join(args.db_dir, f'bench-{scale}.run.db')
+    shutil.copyfile(seeded_path, db_path)
+    return db_path
+
+
+def run_scale(scale, args):
+    os.makedirs(args.db_dir, exist_ok=True)
+    db_path = prepare_database(scale, args)
+    report_path = os.path.join(args.db_dir, f'bench-{scale}.report.json')
+    if os.path.exists(report_path):
+        os.remove(report_path)
+    port = free_port()
+
+    env = dict(
+        os.environ,
+        DATABASE_URL=f'sqlite:///{db_path}',
+        ADMIN_API_TOKEN=ADMIN_TOKEN,
+        EMAIL_TRANSPORT='file',
+        EMAIL_SINK_PATH=os.devnull,
+        CONTACT_DIGEST_ENABLED='',
+        READ_CACHE_TTL='0',  # measure the query path, not read cache hits
+    )
+    child = subprocess.Popen(
+        [sys.executable, __file__, '--serve', '--port', str(port), '--report', report_path],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while not os.path.exists(report_path):
+            if child.poll() is not None:
+                raise SystemExit(f'benchmark server for scale {scale} exited with {child.returncode}')
+            time.sleep(0.2)
+        with open(report_path) as report:
+            report = json.load(report)
+        if report['missing_routes']:
+            raise SystemExit(f'Routes missing from benchmarks/run.py ROUTES: {report["missing_routes"]}')
+
+        for _ in range(100):
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                break
+            except OSError:
+                time.sleep(0.1)
+
+        results = {}
+        for name, request in measurement_order():
+            summary = load('127.0.0.1', port, [request], concurrency=args.concurrency,
+                           duration=args.duration, timeout=args.timeout).summary()
+            summary['memory_kb'] = round(report['memory'][name] / 1024, 1)
+            results[name] = summary
+            print(f'{scale:>7} {name:<24} {summary["throughput"]:>9.1f} {summary["p50_ms"]:>9.1f} '
+                  f'{summary["p95_ms"]:>9.1f} {summary["p99_ms"]:>9.1f} '
+                  f'{summary["memory_kb"]:>10.1f} {summary["errors"]:>6}', flush=True)
+        return results
+    finally:
+        child.terminate()
+        child.wait()
+
+
+def compare(results, baseline, tolerance):
+    """List human-readable regressions of ``results`` against ``baseline``
+
+    A route with no baseline entry counts as a regression: it is unmeasured,
+    not passing.
+    """
+    regressions = []
+    for scale, routes in results.items():
+        for name, current in routes.items():
+            previous = baseline.get(scale, {}).get(name)
+            label = f'scale={scale} {name}'
+            if not previous:
+                regressions.append(f'{label}: no baseline entry (run with --update-baseline)')
+                continue
+            # Absolute floors keep sub-millisecond jitter from failing the run
+            if current['p95_ms'] > previous['p95_ms'] * (1 + tolerance) + 1.0:
+                regressions.append(f'{label}: p95 {previous["p95_ms"]} -> {current["p95_ms"]} ms')
+            if current['throughput'] < previous['throughput'] * (1 - tolerance):
+                regressions.append(f'{label}: throughput {previous["throughput"]} -> {current["throughput"]} req/s')
+            if current['memory_kb'] > previous['memory_kb'] * (1 + tolerance) + 64:
+                regressions.append(f'{label}: memory {previous["memory_kb"]} -> {current["memory_kb"]} KiB')
+            if current['errors'] > previous['errors']:
+                regressions.append(f'{label}: errors {previous["errors"]} -> {current["errors"]}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', default='1000,10000')  # the scales in baseline.json
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds of load per route')
+    parser.add_argument('--timeout', type=float, default=60.0, help='per-request timeout')
+    parser.add_argument('--db-dir', default='/tmp/portfolio-bench',
+                        help='where seeded databases are kept between runs')
+    parser.add_argument('--output', help='write results JSON here')
+    parser.add_argument('--baseline', default=os.path.join(BENCH_DIR, 'baseline.json'))
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--update-baseline', action='store_true')
+    # Internal: seed a database, or run as the benchmark server for one scale
+    parser.add_argument('--seed', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--report', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.seed:
+        sys.path.insert(0, ROOT)
+        return seed(args.seed)
+    if args.serve:
+        sys.path.insert(0, ROOT)
+        return serve(args.port, args.report)
+
+    print(f'{"scale":>7} {"route":<24} {"req/s":>9} {"p50 ms":>9} {"p95 ms":>9} '
+          f'{"p99 ms":>9} {"mem KiB":>10} {"errors":>6}')
+    results = {str(scale): run_scale(int(scale), args) for scale in args.scales.split(',')}
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as stored:
+                baseline = json.load(stored)
+        baseline.update(results)
+        with open(args.baseline, 'w') as stored:
+            json.dump(baseline, stored, indent=2, sort_keys=True)
+        print(f'\nBaseline updated: {args.baseline}')
+        return
+
+    if not os.path.exists(args.baseline):
+        print('\nNo baseline stored; run with --update-baseline to create one')
+        return
+    with open(args.baseline) as stored:
+        regressions = compare(results, json.load(stored), args.tolerance)
+    if regressions:
+        print('\nREGRESSIONS against baseline:')
+        for regression in regressions:
+            print(f'  {regression}')
+        sys.exit(1)
+    print('\nNo regressions against baseline')
+
+
+if __name__ == '__main__':
+    main()
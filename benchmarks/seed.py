@@ -0,0 +1,132 @@
+"""Seed a database with synthetic portfolio data for benchmarking.
+
+Usage:
+    DATABASE_URL=sqlite:////tmp/bench.db python benchmarks/seed.py --scale 10000
+
+Adds ``scale`` projects, testimonials and contacts (plus a proportional
+number of timeline entries and achievements) through the models in
+models.py. Data is generated from a fixed random seed, so every run at a
+given scale produces the same dataset.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SCALES = (1000, 10000, 100000)
+
+CATEGORIES = ['Full Stack', 'Frontend', 'AI/ML', 'Fintech', 'Blockchain', 'Mobile']
+TECH = ['Python', 'Flask', 'JavaScript', 'React', 'Node.js', 'PostgreSQL', 'Docker',
+        'Three.js', 'TensorFlow', 'Solidity', 'AWS', 'Redis']
+WORDS = ('portfolio platform realtime secure scalable interactive dashboard analytics '
+         'mobile cloud data pipeline model service api design experience').split()
+CITIES = [
+    ('San Francisco, CA', 37.7749, -122.4194), ('New York, NY', 40.7128, -74.0060),
+    ('London, UK', 51.5074, -0.1278), ('Bengaluru, IN', 12.9716, 77.5946),
+    ('Ahmedabad, IN', 23.0225, 72.5714), ('Berlin, DE', 52.5200, 13.4050),
+    ('Tokyo, JP', 35.6762, 139.6503), ('Sydney, AU', -33.8688, 151.2093),
+]
+STATUSES = ['new', 'notified', 'read', 'replied', 'archived']
+INSERT_BATCH = 5000
+
+
+def _sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def _insert(model, rows):
+    # Regular unit-of-work inserts rather than bulk INSERTs, so mapper and
+    # session events on the models run for synthetic rows too.
+    from app import db
+    for start in range(0, len(rows), INSERT_BATCH):
+        db.session.add_all(model(**row) for row in rows[start:start + INSERT_BATCH])
+        db.session.commit()
+
+
+def seed_database(scale, seed=0):
+    """Insert a synthetic dataset of ``scale`` rows per main table (needs an app context)"""
+    from models import Project, Testimonial, Contact, Timeline, Achievement
+
+    rng = random.Random(seed)
+    now = datetime(2025, 1, 1)
+
+    _insert(Project, [{
+        'title': f'Project {i}',
+        'description': _sentence(rng, 24),
+        'tech_stack': json.dumps(rng.sample(TECH, 4)),
+        'github_url': f'https://github.com/example/project-{i}',
+        'live_url': '#',
+        'image_url': '/static/assets/images/projects/premium-portfolio.svg',
+        'category': rng.choice(CATEGORIES),
+        'featured': rng.random() < 0.2,
+        'created_at': now - timedelta(minutes=i),
+    } for i in range(scale)])
+
+    testimonials = []
+    for i in range(scale):
+        city, lat, lon = rng.choice(CITIES)
+        testimonials.append({
+            'name': f'Client {i}',
+            'company': f'Company {i % 500}',
+            'position': rng.choice(['CTO', 'Founder', 'Engineering Manager', 'Designer']),
+            'content': _sentence(rng, 18),
+            'location': city,
+            'latitude': lat + rng.uniform(-2, 2),
+            'longitude': lon + rng.uniform(-2, 2),
+            'created_at': now - timedelta(minutes=i),
+        })
+    _insert(Testimonial, testimonials)
+
+    _insert(Contact, [{
+        'name': f'Visitor {i}',
+        'email': f'visitor{i}@example.com',
+        'subject': _sentence(rng, 5),
+        'message': _sentence(rng, 40),
+        'status': rng.choice(STATUSES),
+        'created_at': now - timedelta(minutes=i),
+    } for i in range(scale)])
+
+    timeline = []
+    for i in range(max(scale // 100, 1)):
+        start = date(2010, 1, 1) + timedelta(days=rng.randint(0, 5000))
+        ended = rng.random() < 0.8
+        timeline.append({
+            'title': f'Role {i}',
+            'company': f'Company {i % 50}',
+            'description': _sentence(rng, 12),
+            'start_date': start,
+            'end_date': start + timedelta(days=rng.randint(30, 1500)) if ended else None,
+            'category': rng.choice(['job', 'education', 'certification']),
+            'current': not ended,
+        })
+    _insert(Timeline, timeline)
+
+    _insert(Achievement, [{
+        'title': f'Achievement {i}',
+        'category': rng.choice(['Professional Development', 'Competitions & Hackathons']),
+        'organization': f'Organization {i % 20}',
+        'description': _sentence(rng, 12),
+        'date_achieved': date(2020, 1, 1) + timedelta(days=rng.randint(0, 1800)),
+        'icon': 'fas fa-trophy',
+        'badge_color': 'neon-gold',
+    } for i in range(max(scale // 100, 1))])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    from app import app
+    with app.app_context():
+        seed_database(args.scale, args.seed)
+    print(f'Seeded {args.scale} rows per table')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""Minimal local SMTP server that accepts and counts messages.
+
+Stands in for a real mail provider when benchmarking or exercising the SMTP
+transport offline. Connections are kept alive between messages, so pooled
+clients behave as they would against a real relay.
+
+Usage:
+    python benchmarks/smtp_sink.py [--port 1025] [--latency-ms 0]
+
+Then point the app at it:
+    EMAIL_TRANSPORT=smtp SMTP_HOST=127.0.0.1 SMTP_PORT=1025 python main.py
+"""
+import argparse
+import socketserver
+import threading
+import time
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+        self.wfile.flush()
+
+    def handle(self):
+        server = self.server
+        self.reply('220 smtp-sink ready')
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            command = raw.decode('utf-8', 'replace').strip()
+            verb = command[:4].upper()
+
+            if verb == 'EHLO':
+                self.wfile.write(b'250-smtp-sink\r\n250-8BITMIME\r\n250 SMTPUTF8\r\n')
+                self.wfile.flush()
+            elif verb in ('HELO', 'MAIL', 'RCPT', 'RSET', 'NOOP'):
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                size = 0
+                while True:
+                    line = self.rfile.readline()
+                    if not line or line in (b'.\r\n', b'.\n'):
+                        break
+                    size += len(line)
+                if server.latency:
+                    time.sleep(server.latency)
+                server.record(size)
+                self.reply('250 OK queued')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    """Threaded SMTP sink; ``messages`` and ``bytes_received`` count what arrived"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=0, latency_ms=0):
+        super().__init__((host, port), _SMTPHandler)
+        self.latency = latency_ms / 1000
+        self.messages = 0
+        self.bytes_received = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def record(self, size):
+        with self._lock:
+            self.messages += 1
+            self.bytes_received += size
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=1025)
+    parser.add_argument('--latency-ms', type=float, default=0,
+                        help='artificial delay per message to mimic a remote relay')
+    args = parser.parse_args()
+
+    sink = SMTPSink(args.host, args.port, args.latency_ms)
+    print(f'SMTP sink listening on {args.host}:{sink.port}')
+    try:
+        sink.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f'Received {sink.messages} messages ({sink.bytes_received} bytes)')
+        sink.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+"""Change log and delta sync for the public collections.
+
+Every insert, update and delete of a synced row appends a ``ChangeLog``
+entry in the same transaction. Synced rows are projects, skills,
+testimonials, timeline, achievements and stats. ORM flushes are recorded
+per row by session events. Bulk UPDATE/DELETE by primary key is recorded per
+row too. Any other bulk statement records one ``refetch`` entry for its
+whole collection, since the rows it touched are unknown.
+
+``GET /api/changes?since=<cursor>`` returns the current state of every row
+changed after the cursor, the ids of rows deleted since, the collections to
+refetch, and the next cursor:
+
+- With no ``since``, or a cursor older than the last compaction horizon (or
+  one from another database), the response says ``reset``. The client then
+  reloads the collections and continues from the returned cursor.
+- Log ids are assigned at flush but become visible at commit, so a
+  transaction that commits late can land below a cursor already handed out.
+  The returned cursor therefore stops before entries younger than
+  ``CHANGES_SETTLE_SECONDS``. Those entries are sent again on the next poll;
+  applying an upsert twice is harmless.
+
+``flask --app main compact-changes`` (cron) keeps only each row's latest
+entry and drops entries older than ``CHANGES_RETENTION_DAYS``.
+"""
+from datetime import datetime, timedelta
+
+import click
+from sqlalchemy import delete, event, func, insert, select
+
+from app import app, db
+from models import Achievement, ChangeLog, ChangeLogCompaction, Project, Skill, Stats, Testimonial, Timeline
+from queries import serialize_achievement, serialize_project, serialize_skill, serialize_stat, \
+    serialize_testimonial, serialize_timeline
+
+
+def _skill_row(skill):
+    return {**serialize_skill(skill), 'category': skill.category}
+
+def _achievement_row(achievement):
+    return {**serialize_achievement(achievement), 'category': achievement.category}
+
+def _stat_row(stat):
+    return {'id': stat.id, **serialize_stat(stat)}
+
+
+# collection -> (model, row serializer); the names match the /api/<collection> endpoints
+COLLECTIONS = {
+    'projects': (Project, serialize_project),
+    'skills': (Skill, _skill_row),
+    'testimonials': (Testimonial, serialize_testimonial),
+    'timeline': (Timeline, serialize_timeline),
+    'achievements': (Achievement, _achievement_row),
+    'stats': (Stats, _stat_row),
+}
+_COLLECTION_BY_MODEL = {model: collection for collection, (model, _) in COLLECTIONS.items()}
+
+
+def _log(connection, entries):
+    now = datetime.utcnow()
+    connection.execute(insert(ChangeLog.__table__), [
+        {'collection': collection, 'row_id': row_id, 'op': op, 'changed_at': now}
+        for collection, row_id, op in entries
+    ])
+
+
+@event.listens_for(db.session, 'after_flush')
+def _record_flush(session, flush_context):
+    entries = []
+    for obj in session.new:
+        collection = _COLLECTION_BY_MODEL.get(type(obj))
+        if collection:
+            entries.append((collection, obj.id, 'upsert'))
+    for obj in session.dirty:
+        collection = _COLLECTION_BY_MODEL.get(type(obj))
+        if collection and session.is_modified(obj, include_collections=False):
+            entries.append((collection, obj.id, 'upsert'))
+    for obj in session.deleted:
+        collection = _COLLECTION_BY_MODEL.get(type(obj))
+        if collection:
+            entries.append((collection, obj.id, 'delete'))
+    if entries:
+        _log(session.connection(), entries)
+
+
+@event.listens_for(db.session, 'do_orm_execute')
+def _record_bulk(orm_execute_state):
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    collection = _COLLECTION_BY_MODEL.get(mapper.class_) if mapper is not None else None
+    if collection is None:
+        return
+
+    params = orm_execute_state.parameters
+    has_ids = isinstance(params, list) and bool(params) and all(p.get('id') is not None for p in params)
+    # Bulk INSERT with explicit ids, or UPDATE/DELETE by primary key with no WHERE clause
+    if has_ids and (orm_execute_state.is_insert or orm_execute_state.statement.whereclause is None):
+        op = 'delete' if orm_execute_state.is_delete else 'upsert'
+        entries = [(collection, p['id'], op) for p in params]
+    else:
+        entries = [(collection, None, 'refetch')]
+    _log(orm_execute_state.session.connection(), entries)
+
+
+def _parse_cursor(value):
+    try:
+        cursor = int(value)
+    except ValueError:
+        raise ValueError('since must be a cursor returned by /api/changes')
+    if cursor < 0:
+        raise ValueError('since must be a cursor returned by /api/changes')
+    return cursor
+
+
+def changes_since(since):
+    """Delta payload for a client at cursor ``since`` (None for a new client); raises ValueError"""
+    latest = db.session.scalar(select(func.max(ChangeLog.id))) or 0
+    horizon = db.session.scalar(select(func.max(ChangeLogCompaction.horizon))) or 0
+    latest = max(latest, horizon)
+    reset = {'cursor': str(latest), 'reset': True, 'changes': {}, 'refetch': []}
+
+    if since is None:
+        return reset
+    cursor = _parse_cursor(since)
+    if cursor < horizon or cursor > latest:
+        return reset  # entries were compacted away, or the cursor belongs to another database
+    if cursor == latest:
+        return {'cursor': str(cursor), 'reset': False, 'changes': {}, 'refetch': []}
+
+    limit = app.config['CHANGES_MAX_ENTRIES']
+    entries = db.session.execute(
+        select(ChangeLog.id, ChangeLog.collection, ChangeLog.row_id, ChangeLog.op, ChangeLog.changed_at)
+        .where(ChangeLog.id > cursor)
+        .order_by(ChangeLog.id)
+        .limit(limit + 1)
+    ).all()
+    if len(entries) > limit:
+        return reset  # reloading is cheaper than replaying this many entries
+
+    settled_before = datetime.utcnow() - timedelta(seconds=app.config['CHANGES_SETTLE_SECONDS'])
+    next_cursor = cursor
+    settling = False
+    ops = {}  # collection -> {row_id: latest op}
+    refetch = set()
+    for entry in entries:
+        # Advance only over the run of settled entries; later ones are sent again next time
+        if not settling and entry.changed_at <= settled_before:
+            next_cursor = entry.id
+        else:
+            settling = True
+        if entry.op == 'refetch':
+            refetch.add(entry.collection)
+        else:
+            ops.setdefault(entry.collection, {})[entry.row_id] = entry.op
+
+    changes = {}
+    for collection, row_ops in ops.items():
+        if collection in refetch or collection not in COLLECTIONS:
+            continue
+        model, serialize = COLLECTIONS[collection]
+        upserted_ids = [row_id for row_id, op in row_ops.items() if op == 'upsert']
+        rows = db.session.execute(select(model).where(model.id.in_(upserted_ids))).scalars().all() \
+            if upserted_ids else []
+        found = {row.id for row in rows}
+        changes[collection] = {
+            'upserted': [serialize(row) for row in rows],
+            # A row missing here was deleted after the log was read
+            'deleted': sorted(row_id for row_id, op in row_ops.items() if op == 'delete' or row_id not in found),
+        }
+    return {'cursor': str(next_cursor), 'reset': False, 'changes': changes, 'refetch': sorted(refetch)}
+
+
+def compact_change_log(retention_days):
+    """Drop superseded entries and entries older than ``retention_days``; returns the number removed"""
+    superseded = db.session.execute(
+        delete(ChangeLog).where(ChangeLog.id.notin_(
+            select(func.max(ChangeLog.id)).group_by(ChangeLog.collection, ChangeLog.row_id)
+        ))
+    ).rowcount
+
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    horizon = db.session.scalar(select(func.max(ChangeLog.id)).where(ChangeLog.changed_at < cutoff))
+    expired = 0
+    if horizon is not None:
+        expired = db.session.execute(delete(ChangeLog).where(ChangeLog.id <= horizon)).rowcount
+        db.session.add(ChangeLogCompaction(horizon=horizon, removed=superseded + expired))
+    db.session.commit()
+    return superseded + expired
+
+
+@app.cli.command('compact-changes')
+@click.option('--retention-days', type=int, default=None, help='Defaults to CHANGES_RETENTION_DAYS.')
+def compact_changes_command(retention_days):
+    """Compact the /api/changes log (for cron)."""
+    if retention_days is None:
+        retention_days = app.config['CHANGES_RETENTION_DAYS']
+    removed = compact_change_log(retention_days)
+    remaining = db.session.scalar(select(func.count(ChangeLog.id)))
+    click.echo(f'Removed {removed} change log entries, {remaining} remain')
@@ -0,0 +1,121 @@
+"""Device variants from client hints, so low-end clients skip the 3D bundle.
+
+HTML responses announce the hints with ``Accept-CH``. ``Critical-CH`` makes
+Chromium retry a first visit that arrived without them. Each request is
+then classified from ``Save-Data``, ``ECT``, ``Device-Memory`` and ``DPR``
+(or their ``Sec-CH-`` names):
+
+- ``lite``: Save-Data on, a 2G-class connection, or 1 GB of memory or
+  less. Pages leave out three.js, particles and the GPU optimizer, and the
+  read API drops optional fields such as images (``LITE_OMIT_FIELDS``); the
+  pages render without them.
+- ``reduced``: 2 GB of memory, a 3G connection, or DPR 3 or higher. The 3D
+  page loads with the low GPU tier preset instead of probing WebGL.
+- ``full``: everything else, including clients that send no hints.
+
+Every hint consulted is added to ``Vary``. Shared caches then keep the
+variants apart, and the per-worker read cache keys on the variant too.
+"""
+from flask import g, request
+
+from app import app
+
+SAVE_DATA_HINTS = ('Save-Data',)
+NETWORK_HINTS = ('ECT',)
+MEMORY_HINTS = ('Sec-CH-Device-Memory', 'Device-Memory')
+DPR_HINTS = ('Sec-CH-DPR', 'DPR')
+
+ACCEPT_CH = ', '.join(MEMORY_HINTS + DPR_HINTS + NETWORK_HINTS)
+CRITICAL_CH = ', '.join(MEMORY_HINTS + NETWORK_HINTS)
+
+LITE_ECT = ('slow-2g', '2g')
+REDUCED_ECT = ('3g',)
+LITE_MAX_MEMORY_GB = 1
+REDUCED_MAX_MEMORY_GB = 2
+REDUCED_MIN_DPR = 3
+
+# READ_ENDPOINTS path -> fields dropped from each row for lite clients
+LITE_OMIT_FIELDS = {
+    '/api/projects': frozenset(('image_url', 'created_at')),
+    '/api/testimonials': frozenset(('avatar_url', 'latitude', 'longitude', 'created_at')),
+    '/api/stats': frozenset(('updated_at',)),
+}
+
+
+def _vary(*hint_groups):
+    # Every variant of a URL must carry the same Vary, however early classification stopped
+    vary = g.setdefault('client_hints_vary', set())
+    for names in hint_groups:
+        vary.update(names)
+
+
+def _hint(names):
+    """First of ``names`` present on the request"""
+    for name in names:
+        value = request.headers.get(name)
+        if value:
+            return value.strip().strip('"').lower()
+    return None
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_lite():
+    if _hint(SAVE_DATA_HINTS) == 'on':
+        return True
+    if _hint(NETWORK_HINTS) in LITE_ECT:
+        return True
+    memory = _number(_hint(MEMORY_HINTS))
+    return memory is not None and memory <= LITE_MAX_MEMORY_GB
+
+
+def api_variant():
+    """'lite' or 'full' for read API payloads"""
+    _vary(SAVE_DATA_HINTS, NETWORK_HINTS, MEMORY_HINTS)
+    return 'lite' if _is_lite() else 'full'
+
+
+def page_variant():
+    """'lite', 'reduced' or 'full' for HTML pages"""
+    _vary(SAVE_DATA_HINTS, NETWORK_HINTS, MEMORY_HINTS, DPR_HINTS)
+    if _is_lite():
+        return 'lite'
+    memory = _number(_hint(MEMORY_HINTS))
+    dpr = _number(_hint(DPR_HINTS))
+    if _hint(NETWORK_HINTS) in REDUCED_ECT \
+            or (memory is not None and memory <= REDUCED_MAX_MEMORY_GB) \
+            or (dpr is not None and dpr >= REDUCED_MIN_DPR):
+        return 'reduced'
+    return 'full'
+
+
+def lite_row(path, row):
+    omit = LITE_OMIT_FIELDS.get(path)
+    if not omit:
+        return row
+    return {field: value for field, value in row.items() if field not in omit}
+
+
+def lite_payload(path, payload):
+    """A shaped READ_ENDPOINTS payload (list of rows or rows grouped by category) without omitted fields"""
+    if path not in LITE_OMIT_FIELDS:
+        return payload
+    if isinstance(payload, dict):
+        return {group: [lite_row(path, row) for row in rows] for group, rows in payload.items()}
+    return [lite_row(path, row) for row in payload]
+
+
+@app.after_request
+def add_client_hint_headers(response):
+    hints = g.get('client_hints_vary')
+    if hints:
+        response.vary.update(sorted(hints))
+    if response.mimetype == 'text/html':
+        response.headers['Accept-CH'] = ACCEPT_CH
+        response.headers['Critical-CH'] = CRITICAL_CH
+    return response
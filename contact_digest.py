@@ -0,0 +1,105 @@
+"""Digest mode for contact form notifications.
+
+Instead of emailing the owner on every submission, new ``Contact`` rows
+(``status='new'``) are collected and sent as one summary email once the
+oldest pending row is older than ``CONTACT_DIGEST_WINDOW`` seconds or
+``CONTACT_DIGEST_MAX`` rows are waiting. Auto-replies for the same rows go
+out through the provider's batch API in the same flush.
+
+Flushes are triggered opportunistically after each submission and can also
+be run from cron with ``flask --app main send-contact-digest``.
+"""
+from datetime import datetime, timedelta
+
+import click
+from sqlalchemy import func, update
+
+from app import app, db
+from models import Contact
+
+# Upper bound on rows folded into a single digest email
+DIGEST_BATCH_LIMIT = 500
+
+
+def digest_enabled():
+    return app.config.get('CONTACT_DIGEST_ENABLED', False)
+
+
+def digest_due():
+    """Return True when the pending contacts should be flushed now"""
+    pending, oldest = db.session.query(
+        func.count(Contact.id), func.min(Contact.created_at)
+    ).filter(Contact.status == 'new').one()
+
+    if not pending:
+        return False
+    if pending >= app.config['CONTACT_DIGEST_MAX']:
+        return True
+    window = timedelta(seconds=app.config['CONTACT_DIGEST_WINDOW'])
+    return oldest is not None and oldest <= datetime.utcnow() - window
+
+
+def _set_status(ids, from_status, to_status):
+    """Move ``ids`` between statuses in one UPDATE, returning the row count"""
+    result = db.session.execute(
+        update(Contact)
+        .where(Contact.id.in_(ids), Contact.status == from_status)
+        .values(status=to_status)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def flush_contact_digest(force=False):
+    """Send the pending contacts as one digest and mark them as notified"""
+    if not force and not digest_due():
+        return {"success": True, "sent": 0}
+
+    contacts = Contact.query.filter_by(status='new') \
+        .order_by(Contact.id).limit(DIGEST_BATCH_LIMIT).all()
+    if not contacts:
+        return {"success": True, "sent": 0}
+
+    ids = [c.id for c in contacts]
+    payload = [{
+        'name': c.name,
+        'email': c.email,
+        'subject': c.subject,
+        'message': c.message,
+        'created_at': c.created_at,
+    } for c in contacts]
+
+    # Claim the rows first so concurrent workers never send the same digest
+    if _set_status(ids, 'new', 'notified') != len(ids):
+        db.session.rollback()
+        return {"success": False, "error": "Digest already being sent"}
+    db.session.commit()
+
+    from email_service import EmailService
+    email_service = EmailService()
+
+    digest_result = email_service.send_contact_digest(payload)
+    if not digest_result.get('success'):
+        # Hand the rows back so the next flush retries them
+        _set_status(ids, 'notified', 'new')
+        db.session.commit()
+        app.logger.warning(f"Contact digest failed: {digest_result.get('error')}")
+        return digest_result
+
+    auto_reply_result = email_service.send_auto_replies(payload)
+    if not auto_reply_result.get('success'):
+        app.logger.warning(f"Digest auto-replies failed: {auto_reply_result.get('error')}")
+
+    app.logger.info(f"Contact digest sent for {len(ids)} submissions. Email ID: {digest_result.get('email_id')}")
+    return {"success": True, "sent": len(ids), "email_id": digest_result.get('email_id')}
+
+
+@app.cli.command('send-contact-digest')
+@click.option('--force', is_flag=True, help='Send pending contacts even if the digest window has not elapsed.')
+def send_contact_digest_command(force):
+    """Send the pending contact digest (for cron)."""
+    result = flush_contact_digest(force=force)
+    if result.get('success'):
+        click.echo(f"Sent digest for {result.get('sent', 0)} contact(s)")
+    else:
+        raise click.ClickException(result.get('error', 'Digest failed'))
@@ -0,0 +1,163 @@
+"""Shared data version for keeping per-worker caches coherent.
+
+Every gunicorn worker holds its own in-process caches, but a write lands in
+only one of them. Each commit that changed public data (``PUBLIC_MODELS``)
+bumps a 64-bit counter stored in a small file that all workers on the node
+mmap. At the start of each request a worker reads the counter, which is one
+memory read with no syscall or query. If the value moved, the worker drops its local caches.
+
+Entries are tagged with the version seen when the request started and are
+only served while that version is still current. So a request that raced
+a commit can never publish stale data. This needs no external service, but
+it is single-node: workers on other machines never see the file.
+"""
+import mmap
+import os
+import struct
+import threading
+import time
+
+from flask import g
+from sqlalchemy import event, inspect
+
+from app import app, db
+from models import Achievement, GeoCluster, Project, Skill, Stats, Testimonial, Timeline
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+# Tables behind cached public responses; writes to anything else (contacts,
+# the change log) do not invalidate caches
+PUBLIC_MODELS = frozenset((Project, Skill, Testimonial, GeoCluster, Timeline, Stats, Achievement))
+
+# version, then the wall-clock time of the last bump
+_COUNTER = struct.Struct('<Qd')
+
+
+class SharedCounter:
+    """A 64-bit counter (plus last-bump time) in an mmap'd file, shared by every process on the node"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < _COUNTER.size:
+                os.ftruncate(fd, _COUNTER.size)
+            self._map = mmap.mmap(fd, _COUNTER.size)
+        finally:
+            os.close(fd)
+
+    def value(self):
+        return _COUNTER.unpack_from(self._map)[0]
+
+    def changed_at(self):
+        """Unix time of the last increment, 0.0 if never bumped"""
+        return _COUNTER.unpack_from(self._map)[1]
+
+    def increment(self):
+        # flock locks belong to the open file, and forked workers share
+        # inherited descriptors, so every bump opens the file afresh
+        with self._lock, open(self.path, 'rb') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            value = self.value() + 1
+            _COUNTER.pack_into(self._map, 0, value, time.time())
+            return value
+
+
+class LocalCache:
+    """Per-process cache whose entries expire with the shared data version"""
+
+    def __init__(self, maxsize=256, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+        _caches.append(self)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        version, stored_at, value = entry
+        if version != _seen_version or (self.ttl and time.monotonic() - stored_at > self.ttl):
+            return None
+        return value
+
+    def set(self, key, value):
+        if not self.maxsize:
+            return
+        version = g.get('data_version', _seen_version)
+        if version != _seen_version:
+            return  # data changed while this request ran; do not cache its result
+        if g.get('read_from_replica') and time.time() - counter.changed_at() < app.config['DB_STICKY_SECONDS']:
+            return  # a replica may not have caught up with the latest write yet
+        with self._lock:
+            if len(self._entries) >= self.maxsize and key not in self._entries:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (version, time.monotonic(), value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_caches = []
+_seen_version = None
+counter = SharedCounter(app.config.get('DATA_VERSION_PATH') or os.path.join(app.instance_path, 'data_version'))
+
+
+def current_version():
+    return counter.value()
+
+
+@app.before_request
+def sync_data_version():
+    """Drop local caches if another worker committed since the last request"""
+    global _seen_version
+    version = counter.value()
+    g.data_version = version
+    if version != _seen_version:
+        for cache in _caches:
+            cache.clear()
+        _seen_version = version
+
+
+def _is_public(mapper):
+    return mapper is not None and mapper.class_ in PUBLIC_MODELS
+
+
+# Writes are recorded per session and published only once they are committed.
+# 'data_changed' (any write) keeps db_routing's reads on the primary; only
+# 'public_data_changed' moves the shared version, so contact form posts and
+# inbox updates leave every worker's caches and the service worker alone.
+@event.listens_for(db.session, 'after_flush')
+def _flushed(session, flush_context):
+    session.info['data_changed'] = True
+    if any(_is_public(inspect(obj).mapper) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info['public_data_changed'] = True
+
+
+@event.listens_for(db.session, 'do_orm_execute')
+def _executed(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info['data_changed'] = True
+        if _is_public(orm_execute_state.bind_mapper):
+            orm_execute_state.session.info['public_data_changed'] = True
+
+
+@event.listens_for(db.session, 'after_commit')
+def _committed(session):
+    session.info.pop('data_changed', None)
+    if session.info.pop('public_data_changed', False):
+        counter.increment()
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _rolled_back(session):
+    session.info.pop('data_changed', None)
+    session.info.pop('public_data_changed', None)
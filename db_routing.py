@@ -0,0 +1,165 @@
+"""Read/write routing between the primary database and read replicas.
+
+Set ``DATABASE_REPLICA_URLS`` to one or more comma-separated URLs. Each is
+registered as a ``replica_<n>`` bind. ``RoutingSession`` then sends plain
+SELECTs issued while handling a GET/HEAD/OPTIONS request to a healthy
+replica chosen at random. Everything else goes to the primary: flushes,
+INSERT/UPDATE/DELETE, raw SQL, CLI commands and reads in a session that has
+already written.
+
+- Read-your-writes: any unsafe request (POST, ...) sets a short-lived
+  ``db_primary`` cookie. That client's reads stay on the primary for
+  ``DB_STICKY_SECONDS`` while the replicas catch up.
+- Failover: a replica whose connection or query fails is skipped for
+  ``DB_REPLICA_RETRY_SECONDS`` and the failed read is rerun on the primary.
+  Idle replicas are re-checked with ``SELECT 1`` at most every
+  ``DB_REPLICA_CHECK_SECONDS``. With no healthy replica left, reads fall
+  back to the primary.
+
+For local testing, point the replicas at extra SQLite files and copy the
+primary into them with ``flask --app main sync-replicas``.
+"""
+import random
+import sqlite3
+import threading
+import time
+
+import click
+import sqlalchemy as sa
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+
+SAFE_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS'))
+STICKY_COOKIE = 'db_primary'
+REPLICA_BIND_PREFIX = 'replica_'
+
+
+def replica_binds(urls):
+    """SQLALCHEMY_BINDS entries for a comma-separated DATABASE_REPLICA_URLS value"""
+    urls = [url.strip() for url in (urls or '').split(',') if url.strip()]
+    return {f'{REPLICA_BIND_PREFIX}{i}': url for i, url in enumerate(urls)}
+
+
+class ReplicaHealth:
+    """Per-process view of which replica engines are usable"""
+
+    def __init__(self):
+        self._down_until = {}
+        self._checked_at = {}
+        self._lock = threading.Lock()
+
+    def mark_down(self, engine, seconds):
+        with self._lock:
+            self._down_until[engine] = time.monotonic() + seconds
+
+    def is_down(self, engine):
+        return self._down_until.get(engine, 0) > time.monotonic()
+
+    def usable(self, engine, retry_seconds, check_seconds):
+        now = time.monotonic()
+        if self._down_until.get(engine, 0) > now:
+            return False
+        if now - self._checked_at.get(engine, float('-inf')) < check_seconds:
+            return True
+        self._checked_at[engine] = now
+        try:
+            with engine.connect() as connection:
+                connection.exec_driver_sql('SELECT 1')
+        except sa.exc.DBAPIError as e:
+            current_app.logger.warning(f'Replica {engine.url!r} unavailable, reading from primary: {e}')
+            self.mark_down(engine, retry_seconds)
+            return False
+        return True
+
+
+health = ReplicaHealth()
+
+
+def _reads_may_use_replica(session):
+    if not has_request_context() or request.method not in SAFE_METHODS:
+        return False
+    if request.cookies.get(STICKY_COOKIE):
+        return False
+    # The session already wrote something; keep it consistent with itself
+    return not (session.info.get('data_changed') or session.new or session.dirty or session.deleted)
+
+
+def choose_replica(engines):
+    config = current_app.config
+    replicas = [engine for key, engine in engines.items()
+                if isinstance(key, str) and key.startswith(REPLICA_BIND_PREFIX)]
+    random.shuffle(replicas)
+    for engine in replicas:
+        if health.usable(engine, config['DB_REPLICA_RETRY_SECONDS'], config['DB_REPLICA_CHECK_SECONDS']):
+            return engine
+    return None
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that sends request-time SELECTs to a replica"""
+
+    _replica_used = None
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and isinstance(clause, sa.Select) \
+                and _reads_may_use_replica(self):
+            engine = choose_replica(self._db.engines)
+            if engine is not None:
+                g.read_from_replica = True
+                self._replica_used = engine
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def execute(self, statement, *args, **kwargs):
+        self._replica_used = None
+        try:
+            return super().execute(statement, *args, **kwargs)
+        except sa.exc.DBAPIError:
+            # handle_error has marked the replica down; rerun the read on the primary
+            if self._replica_used is None or not health.is_down(self._replica_used):
+                raise
+            self.rollback()
+            return super().execute(statement, *args, **kwargs)
+
+
+def init_routing(app, db):
+    """Register failover tracking, the stickiness cookie and the sync-replicas command"""
+    replicas = {key: engine for key, engine in db.engines.items()
+                if isinstance(key, str) and key.startswith(REPLICA_BIND_PREFIX)}
+
+    for engine in replicas.values():
+        @sa.event.listens_for(engine, 'handle_error')
+        def _replica_failed(context, engine=engine):
+            if context.is_disconnect or isinstance(context.sqlalchemy_exception, sa.exc.OperationalError):
+                health.mark_down(engine, app.config['DB_REPLICA_RETRY_SECONDS'])
+
+    @app.after_request
+    def stick_to_primary(response):
+        if replicas and request.method not in SAFE_METHODS:
+            response.set_cookie(STICKY_COOKIE, '1', max_age=app.config['DB_STICKY_SECONDS'],
+                                httponly=True, samesite='Lax')
+        return response
+
+    @app.cli.command('sync-replicas')
+    def sync_replicas_command():
+        """Copy the primary SQLite database into each SQLite replica (local testing)."""
+        primary = db.engines[None]
+        if primary.dialect.name != 'sqlite':
+            raise click.ClickException('sync-replicas only copies SQLite files; '
+                                       'use the database server\'s replication otherwise')
+        if not replicas:
+            raise click.ClickException('DATABASE_REPLICA_URLS is not configured')
+        source = primary.raw_connection()
+        try:
+            for key, engine in replicas.items():
+                if engine.dialect.name != 'sqlite':
+                    raise click.ClickException(f'{key} is not a SQLite database')
+                engine.dispose()  # drop pooled connections to the old copy
+                target = sqlite3.connect(engine.url.database)
+                try:
+                    source.driver_connection.backup(target)
+                finally:
+                    target.close()
+                click.echo(f'Copied primary to {key} ({engine.url.database})')
+        finally:
+            source.close()
@@ -1,102 +1,71 @@
 import os
-import resend
 from datetime import datetime
+from functools import lru_cache
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from email_transport import get_transport
 import dotenv
 # Load environment variables from .env file
 dotenv.load_dotenv()
 
+EMAIL_TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates', 'email')
+
+# One environment per process: templates are compiled on first use and kept
+# for the lifetime of the worker. HTML templates are autoescaped so contact
+# form input can never inject markup into the emails.
+_email_env = Environment(
+    loader=FileSystemLoader(EMAIL_TEMPLATE_DIR),
+    autoescape=select_autoescape(['html']),
+    auto_reload=False,
+    cache_size=-1,
+)
+
+@lru_cache(maxsize=None)
+def get_email_template(name):
+    """Return the compiled email template called ``name``"""
+    return _email_env.get_template(name)
+
+def render_email(template_name, **context):
+    """Render the HTML and plain text versions of an email template"""
+    html_content = get_email_template(f'{template_name}.html').render(**context)
+    text_content = get_email_template(f'{template_name}.txt').render(**context)
+    return html_content, text_content
+
+def format_submission_time(timestamp=None):
+    """Human readable submission time used in the email bodies"""
+    return (timestamp or datetime.now()).strftime("%B %d, %Y at %I:%M %p")
+
+def contact_context(contact_data, **extra):
+    """Template context for a contact form submission with display defaults"""
+    context = {
+        'name': contact_data.get('name') or 'Not provided',
+        'email': contact_data.get('email') or 'Not provided',
+        'subject': contact_data.get('subject') or 'No subject',
+        'message': contact_data.get('message') or 'No message provided',
+    }
+    context.update(extra)
+    return context
+
 class EmailService:
-    def __init__(self):
-        self.api_key = os.environ.get('RESEND_API_KEY')
-        if self.api_key:
-            resend.api_key = self.api_key
+    def __init__(self, transport=None):
+        # Transports are pooled per process; EmailService itself is cheap to create
+        self.transport = transport or get_transport()
     
     def send_contact_notification(self, contact_data):
         """Send formatted email notification for contact form submission"""
-        if not self.api_key:
+        if not self.transport:
             return {"success": False, "error": "Email service not configured"}
         
         try:
-            # Format the submission time
-            submission_time = datetime.now().strftime("%B %d, %Y at %I:%M %p")
-            
-            # Create formatted HTML email content
-            html_content = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <style>
-                    body {{ font-family: Arial, sans-serif; margin: 0; padding: 20px; background-color: #f5f5f5; }}
-                    .container {{ max-width: 600px; margin: 0 auto; background: white; border-radius: 10px; overflow: hidden; box-shadow: 0 4px 6px rgba(0,0,0,0.1); }}
-                    .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; text-align: center; }}
-                    .header h1 {{ margin: 0; font-size: 24px; }}
-                    .content {{ padding: 30px; }}
-                    .field {{ margin-bottom: 20px; }}
-                    .field-label {{ font-weight: bold; color: #333; margin-bottom: 5px; }}
-                    .field-value {{ background: #f8f9fa; padding: 15px; border-radius: 5px; border-left: 4px solid #667eea; }}
-                    .message-field {{ background: #f8f9fa; padding: 20px; border-radius: 5px; border-left: 4px solid #667eea; line-height: 1.6; }}
-                    .footer {{ background: #f8f9fa; padding: 20px; text-align: center; color: #666; font-size: 14px; }}
-                    .timestamp {{ color: #888; font-size: 12px; }}
-                </style>
-            </head>
-            <body>
-                <div class="container">
-                    <div class="header">
-                        <h1>🌟 New Contact Form Submission</h1>
-                        <p>Someone reached out through your portfolio website!</p>
-                    </div>
-                    
-                    <div class="content">
-                        <div class="field">
-                            <div class="field-label">👤 Name:</div>
-                            <div class="field-value">{contact_data.get('name', 'Not provided')}</div>
-                        </div>
-                        
-                        <div class="field">
-                            <div class="field-label">📧 Email:</div>
-                            <div class="field-value">{contact_data.get('email', 'Not provided')}</div>
-                        </div>
-                        
-                        <div class="field">
-                            <div class="field-label">📝 Subject:</div>
-                            <div class="field-value">{contact_data.get('subject', 'No subject')}</div>
-                        </div>
-                        
-                        <div class="field">
-                            <div class="field-label">💬 Message:</div>
-                            <div class="message-field">{contact_data.get('message', 'No message provided')}</div>
-                        </div>
-                    </div>
-                    
-                    <div class="footer">
-                        <p class="timestamp">Received on {submission_time}</p>
-                        <p>This email was sent from your portfolio contact form at kavyapatel.dev</p>
-                    </div>
-                </div>
-            </body>
-            </html>
-            """
+            html_content, text_content = render_email(
+                'contact_notification',
+                **contact_context(contact_data, submission_time=format_submission_time())
+            )
             
-            # Create plain text version
-            text_content = f"""
-New Contact Form Submission - Kavya Patel Portfolio
-
-Name: {contact_data.get('name', 'Not provided')}
-Email: {contact_data.get('email', 'Not provided')}
-Subject: {contact_data.get('subject', 'No subject')}
-
-Message:
-{contact_data.get('message', 'No message provided')}
-
-Received on: {submission_time}
-Sent from: Portfolio Contact Form
-            """
-            
-            # Send email using Resend to your verified email
-            email_response = resend.Emails.send({
+            # Send email to your verified email
+            email_response = self.transport.send({
                 "from": "Portfolio Contact <onboarding@resend.dev>",
                 "to": ["kavyapatel1952007@gmail.com"],  # Your verified email address
-                "subject": f"📧 New Contact: {contact_data.get('subject', 'Message from Portfolio')}",
+                "subject": f"📧 New Contact: {contact_data.get('subject') or 'Message from Portfolio'}",
                 "html": html_content,
                 "text": text_content,
                 "reply_to": contact_data.get('email', 'noreply@resend.dev')
@@ -115,81 +84,80 @@ Sent from: Portfolio Contact Form
                 "error": f"Failed to send email: {str(e)}"
             }
     
-    def send_auto_reply(self, contact_data):
-        """Send automatic reply to the person who submitted the form"""
-        if not self.api_key or not contact_data.get('email'):
-            return {"success": False, "error": "Cannot send auto-reply"}
+    def send_contact_digest(self, contacts):
+        """Send one summary email covering several contact form submissions"""
+        if not self.transport:
+            return {"success": False, "error": "Email service not configured"}
+        if not contacts:
+            return {"success": True, "email_id": None}
         
         try:
-            html_content = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <style>
-                    body {{ font-family: Arial, sans-serif; margin: 0; padding: 20px; background-color: #f5f5f5; }}
-                    .container {{ max-width: 600px; margin: 0 auto; background: white; border-radius: 10px; overflow: hidden; box-shadow: 0 4px 6px rgba(0,0,0,0.1); }}
-                    .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; text-align: center; }}
-                    .content {{ padding: 30px; line-height: 1.6; }}
-                    .footer {{ background: #f8f9fa; padding: 20px; text-align: center; color: #666; }}
-                </style>
-            </head>
-            <body>
-                <div class="container">
-                    <div class="header">
-                        <h1>✨ Thank You for Reaching Out!</h1>
-                    </div>
-                    
-                    <div class="content">
-                        <p>Hi {contact_data.get('name', 'there')},</p>
-                        
-                        <p>Thank you for contacting me through my portfolio website! I've received your message and really appreciate you taking the time to reach out.</p>
-                        
-                        <p><strong>Your message details:</strong></p>
-                        <p><em>Subject: {contact_data.get('subject', 'No subject')}</em></p>
-                        
-                        <p>I'll review your message and get back to you as soon as possible, typically within 24-48 hours.</p>
-                        
-                        <p>In the meantime, feel free to:</p>
-                        <ul>
-                            <li>Check out my latest projects on the portfolio</li>
-                            <li>Connect with me on social media</li>
-                            <li>Explore my skills and experience</li>
-                        </ul>
-                        
-                        <p>Best regards,<br><strong>Kavya Patel</strong></p>
-                    </div>
-                    
-                    <div class="footer">
-                        <p>This is an automated response from kavyapatel.dev</p>
-                    </div>
-                </div>
-            </body>
-            </html>
-            """
-            
-            text_content = f"""
-Hi {contact_data.get('name', 'there')},
-
-Thank you for contacting me through my portfolio website! I've received your message about "{contact_data.get('subject', 'No subject')}" and really appreciate you taking the time to reach out.
-
-I'll review your message and get back to you as soon as possible, typically within 24-48 hours.
-
-Best regards,
-Kavya Patel
-
----
-This is an automated response from kavyapatel.dev
-            """
+            html_content, text_content = render_email(
+                'contact_digest',
+                contacts=[
+                    contact_context(
+                        contact,
+                        submission_time=format_submission_time(contact.get('created_at'))
+                    )
+                    for contact in contacts
+                ]
+            )
             
-            resend.Emails.send({
-                "from": "Kavya Patel <onboarding@resend.dev>",
-                "to": [contact_data.get('email')],
-                "subject": "✨ Thank you for your message - Kavya Patel",
+            count = len(contacts)
+            email_response = self.transport.send({
+                "from": "Portfolio Contact <onboarding@resend.dev>",
+                "to": ["kavyapatel1952007@gmail.com"],  # Your verified email address
+                "subject": f"📬 {count} New Contact{'s' if count != 1 else ''} from Portfolio",
                 "html": html_content,
-                "text": text_content
+                "text": text_content,
+                "reply_to": contacts[0].get('email') if count == 1 else 'noreply@resend.dev'
             })
+            
+            return {"success": True, "email_id": email_response.get('id')}
+            
+        except Exception as e:
+            print(f"Digest sending error: {str(e)}")
+            return {"success": False, "error": f"Failed to send digest: {str(e)}"}
+    
+    def _auto_reply_params(self, contact_data):
+        """Build the provider payload for a single auto-reply"""
+        html_content, text_content = render_email(
+            'auto_reply',
+            **contact_context(contact_data, name=contact_data.get('name') or 'there')
+        )
+        return {
+            "from": "Kavya Patel <onboarding@resend.dev>",
+            "to": [contact_data.get('email')],
+            "subject": "✨ Thank you for your message - Kavya Patel",
+            "html": html_content,
+            "text": text_content
+        }
+    
+    def send_auto_reply(self, contact_data):
+        """Send automatic reply to the person who submitted the form"""
+        if not self.transport or not contact_data.get('email'):
+            return {"success": False, "error": "Cannot send auto-reply"}
+        
+        try:
+            self.transport.send(self._auto_reply_params(contact_data))
             return {"success": True}
             
         except Exception as e:
             print(f"Auto-reply error: {str(e)}")
-            return {"success": False, "error": str(e)}
\ No newline at end of file
+            return {"success": False, "error": str(e)}
+    
+    def send_auto_replies(self, contacts):
+        """Send auto-replies to several senders using the provider's batch API"""
+        recipients = [contact for contact in contacts if contact.get('email')]
+        if not self.transport or not recipients:
+            return {"success": False, "error": "Cannot send auto-replies"}
+        
+        try:
+            results = self.transport.send_batch(
+                [self._auto_reply_params(contact) for contact in recipients]
+            )
+            return {"success": True, "sent": len(results)}
+            
+        except Exception as e:
+            print(f"Auto-reply batch error: {str(e)}")
+            return {"success": False, "error": str(e)}
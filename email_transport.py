@@ -0,0 +1,304 @@
+"""Pluggable delivery backends for EmailService.
+
+Every transport takes Resend-style message dicts (``from``, ``to``,
+``subject``, ``html``, ``text``, optional ``reply_to``) so EmailService can
+build a payload once and hand it to whichever backend is configured:
+
+- ``resend``: Resend REST API over a pooled keep-alive HTTP session
+- ``smtp``: any SMTP server, reusing a pool of logged-in connections
+- ``file`` / ``console``: write messages as JSON lines (offline dev, benchmarks)
+
+Each transport caps in-flight sends with a semaphore so a burst of contact
+submissions cannot open unbounded connections to the provider.
+"""
+import json
+import os
+import queue
+import smtplib
+import sys
+import threading
+import uuid
+from email.header import Header
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.utils import make_msgid, parseaddr
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class EmailTransportError(Exception):
+    """Raised when a transport fails to hand a message to its backend"""
+
+
+class EmailTransport:
+    """Base class: concurrency limiting and a default one-by-one batch send"""
+
+    name = 'base'
+    batch_limit = 1
+
+    def __init__(self, max_concurrency=8):
+        self.max_concurrency = max_concurrency
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+    def send(self, message):
+        """Deliver one message, returning ``{"id": ...}``"""
+        with self._slots:
+            return self._send(message)
+
+    def send_batch(self, messages):
+        """Deliver several messages, returning one result dict per message"""
+        results = []
+        for start in range(0, len(messages), self.batch_limit):
+            chunk = messages[start:start + self.batch_limit]
+            with self._slots:
+                results.extend(self._send_batch(chunk))
+        return results
+
+    def _send(self, message):
+        raise NotImplementedError
+
+    def _send_batch(self, messages):
+        return [self._send(message) for message in messages]
+
+    def close(self):
+        pass
+
+
+class ResendTransport(EmailTransport):
+    """Resend REST API over a persistent, pooled HTTP session"""
+
+    name = 'resend'
+    batch_limit = 100  # Resend's batch endpoint limit
+
+    def __init__(self, api_key, api_url='https://api.resend.com', pool_size=8,
+                 max_concurrency=8, timeout=10):
+        super().__init__(max_concurrency)
+        self.api_url = api_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Accept': 'application/json',
+            'Authorization': f'Bearer {api_key}',
+        })
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _post(self, path, payload):
+        try:
+            response = self.session.post(f'{self.api_url}{path}', json=payload, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise EmailTransportError(str(e)) from e
+        if response.status_code >= 400:
+            raise EmailTransportError(f'Resend returned {response.status_code}: {response.text}')
+        return response.json()
+
+    def _send(self, message):
+        return {'id': self._post('/emails', message).get('id')}
+
+    def _send_batch(self, messages):
+        data = self._post('/emails/batch', messages).get('data') or []
+        return [{'id': item.get('id')} for item in data]
+
+    def close(self):
+        self.session.close()
+
+
+class SMTPTransport(EmailTransport):
+    """SMTP delivery reusing up to ``pool_size`` logged-in connections"""
+
+    name = 'smtp'
+    batch_limit = 50
+
+    def __init__(self, host='localhost', port=25, username=None, password=None,
+                 starttls=False, use_ssl=False, pool_size=4, max_concurrency=None,
+                 timeout=10, keep_alive=True):
+        super().__init__(max_concurrency or pool_size)
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+
+    def _connect(self):
+        smtp_class = smtplib.SMTP_SSL if self.use_ssl else smtplib.SMTP
+        connection = smtp_class(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            connection.starttls()
+        if self.username:
+            connection.login(self.username, self.password or '')
+        return connection
+
+    def _acquire(self):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def _release(self, connection):
+        if self.keep_alive:
+            try:
+                self._pool.put_nowait(connection)
+                return
+            except queue.Full:
+                pass
+        self._quit(connection)
+
+    @staticmethod
+    def _quit(connection):
+        try:
+            connection.quit()
+        except smtplib.SMTPException:
+            connection.close()
+        except OSError:
+            pass
+
+    @staticmethod
+    def build_message(message):
+        """Convert a Resend-style dict into a MIME message.
+
+        Uses the compat32 MIME classes: the policy-based EmailMessage header
+        registry costs several milliseconds per message, which dominated
+        send time under load.
+        """
+        mime = MIMEMultipart('alternative')
+        mime['From'] = message['from']
+        mime['To'] = ', '.join(message['to'])
+        mime['Subject'] = Header(message['subject'], 'utf-8')
+        mime['Message-ID'] = make_msgid()
+        if message.get('reply_to'):
+            mime['Reply-To'] = message['reply_to']
+        mime.attach(MIMEText(message.get('text') or '', 'plain', 'utf-8'))
+        if message.get('html'):
+            mime.attach(MIMEText(message['html'], 'html', 'utf-8'))
+        return mime
+
+    def _deliver(self, connection, message):
+        mime = self.build_message(message)
+        connection.sendmail(
+            parseaddr(message['from'])[1],
+            [parseaddr(recipient)[1] for recipient in message['to']],
+            mime.as_bytes(),
+        )
+        return {'id': mime['Message-ID']}
+
+    def _send_batch(self, messages):
+        connection = self._acquire()
+        results = []
+        try:
+            for message in messages:
+                try:
+                    results.append(self._deliver(connection, message))
+                except smtplib.SMTPServerDisconnected:
+                    # Pooled connection went stale; retry once on a fresh one
+                    connection.close()
+                    connection = self._connect()
+                    results.append(self._deliver(connection, message))
+        except (smtplib.SMTPException, OSError) as e:
+            connection.close()
+            raise EmailTransportError(str(e)) from e
+        self._release(connection)
+        return results
+
+    def _send(self, message):
+        return self._send_batch([message])[0]
+
+    def close(self):
+        while True:
+            try:
+                self._quit(self._pool.get_nowait())
+            except queue.Empty:
+                break
+
+
+class SinkTransport(EmailTransport):
+    """Write messages as JSON lines to a file, or to stdout when no path is set"""
+
+    name = 'file'
+    batch_limit = 1000
+
+    def __init__(self, path=None, max_concurrency=8):
+        super().__init__(max_concurrency)
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _send_batch(self, messages):
+        results = [{'id': str(uuid.uuid4())} for _ in messages]
+        lines = ''.join(
+            json.dumps(dict(message, id=result['id']), ensure_ascii=False) + '\n'
+            for message, result in zip(messages, results)
+        )
+        with self._lock:
+            if self.path:
+                with open(self.path, 'a', encoding='utf-8') as sink:
+                    sink.write(lines)
+            else:
+                sys.stdout.write(lines)
+                sys.stdout.flush()
+        return results
+
+    def _send(self, message):
+        return self._send_batch([message])[0]
+
+
+def _env_flag(name):
+    return os.environ.get(name, '').lower() in ('1', 'true', 'yes')
+
+
+def create_transport(kind=None):
+    """Build the transport selected by ``EMAIL_TRANSPORT`` (or ``kind``).
+
+    Returns None when the selected backend is not configured, e.g. the
+    default Resend transport without ``RESEND_API_KEY``.
+    """
+    kind = (kind or os.environ.get('EMAIL_TRANSPORT', 'resend')).lower()
+    pool_size = int(os.environ.get('EMAIL_POOL_SIZE', 4))
+    max_concurrency = int(os.environ.get('EMAIL_MAX_CONCURRENCY', pool_size))
+
+    if kind == 'resend':
+        api_key = os.environ.get('RESEND_API_KEY')
+        if not api_key:
+            return None
+        return ResendTransport(
+            api_key,
+            api_url=os.environ.get('RESEND_API_URL', 'https://api.resend.com'),
+            pool_size=pool_size,
+            max_concurrency=max_concurrency,
+        )
+    if kind == 'smtp':
+        return SMTPTransport(
+            host=os.environ.get('SMTP_HOST', 'localhost'),
+            port=int(os.environ.get('SMTP_PORT', 25)),
+            username=os.environ.get('SMTP_USERNAME'),
+            password=os.environ.get('SMTP_PASSWORD'),
+            starttls=_env_flag('SMTP_STARTTLS'),
+            use_ssl=_env_flag('SMTP_SSL'),
+            pool_size=pool_size,
+            max_concurrency=max_concurrency,
+        )
+    if kind in ('file', 'console'):
+        path = os.environ.get('EMAIL_SINK_PATH') if kind == 'file' else None
+        return SinkTransport(path, max_concurrency=max_concurrency)
+    raise ValueError(f'Unknown EMAIL_TRANSPORT: {kind}')
+
+
+_transport = None
+_transport_pid = None
+_transport_lock = threading.Lock()
+
+
+def get_transport():
+    """Process-wide transport, rebuilt after fork so workers never share sockets"""
+    global _transport, _transport_pid
+    pid = os.getpid()
+    if _transport_pid != pid:
+        with _transport_lock:
+            if _transport_pid != pid:
+                _transport = create_transport()
+                _transport_pid = pid
+    return _transport
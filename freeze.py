@@ -0,0 +1,189 @@
+"""Static export: render the site and the read-only API to a directory.
+
+``flask --app main freeze build/static-site`` renders ``/``, ``/dashboard``
+and every public ``/api/*`` GET response through the real app. That includes
+the filtered variants (projects by category and featured, timeline by
+category, map clusters per zoom level). The results are written as plain
+files, with ``.gz`` (and ``.br`` when the brotli package is installed)
+copies next to each, plus ``manifest.json`` listing every URL. ``static/`` is
+copied and precompressed too.
+
+File layout, for ``try_files $uri/$args.json $uri/index.json`` in nginx:
+
+- ``/dashboard`` -> ``dashboard/index.html``
+- ``/sw.js`` -> ``sw.js``
+- ``/api/projects`` -> ``api/projects/index.json``
+- ``/api/projects?category=AI%2FML&featured=true`` -> ``api/projects/category=AI%2FML&featured=true.json``
+
+The export is the ``full`` variant only. Pages and JSON are rendered
+without client hints, and a static server sends no ``Accept-CH`` or
+``Vary``, so every visitor gets the full page and payloads. Serve the lite
+and reduced variants (client_hints.py) from Flask instead.
+
+The contact form and everything in ``DYNAMIC_ENDPOINTS`` stay on Flask.
+The directory is built next to the target and swapped in when complete,
+so a server never sees a half-written export.
+"""
+import gzip
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+from urllib.parse import urlencode
+
+import click
+from sqlalchemy import select
+
+from app import app, db
+from models import Project, Timeline
+from queries import READ_ENDPOINTS
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional
+    brotli = None
+
+# Endpoints that need a live server: writes, owner-only data, arbitrary query input
+DYNAMIC_ENDPOINTS = {
+    'submit_contact', 'list_contacts', 'update_contact_status', 'export_contacts', 'download_source',
+    'get_changes',
+}
+# Query-driven variants of frozen endpoints that cannot be enumerated
+DYNAMIC_QUERIES = [
+    '/api/testimonials/geo?bbox=...', '/api/testimonials/geo?near=...',
+    '/api/timeline?active_at=...', '/api/timeline?from=...&to=...',
+]
+MAX_ZOOM = 22
+COMPRESS_MIN_BYTES = 256
+COMPRESSIBLE_EXTENSIONS = {'.html', '.json', '.css', '.js', '.svg', '.txt', '.xml', '.glsl', '.vert', '.frag'}
+EXTENSIONS = {'text/html': '.html', 'application/json': '.json'}
+
+
+def frozen_urls():
+    """Every URL that the static export renders"""
+    urls = ['/', '/dashboard', '/sw.js', '/precache-manifest.json', '/api/social', '/api/timeline/experience']
+    urls.extend(READ_ENDPOINTS)
+
+    project_categories = db.session.execute(
+        select(Project.category).where(Project.category.isnot(None)).distinct()
+    ).scalars().all()
+    urls.append('/api/projects?' + urlencode({'featured': 'true'}))
+    for category in sorted(project_categories):
+        urls.append('/api/projects?' + urlencode({'category': category}))
+        urls.append('/api/projects?' + urlencode({'category': category, 'featured': 'true'}))
+
+    timeline_categories = db.session.execute(
+        select(Timeline.category).where(Timeline.category.isnot(None)).distinct()
+    ).scalars().all()
+    for category in sorted(timeline_categories):
+        urls.append('/api/timeline?' + urlencode({'category': category}))
+
+    for zoom in range(MAX_ZOOM + 1):
+        urls.append('/api/testimonials/geo?' + urlencode({'zoom': zoom}))
+    return urls
+
+
+def unfrozen_endpoints(urls):
+    """GET endpoints that are neither frozen nor declared dynamic"""
+    adapter = app.url_map.bind('localhost')
+    frozen = {adapter.match(url.split('?')[0])[0] for url in urls}
+    return sorted(
+        rule.endpoint for rule in app.url_map.iter_rules()
+        if 'GET' in rule.methods and rule.endpoint != 'static'
+        and rule.endpoint not in frozen and rule.endpoint not in DYNAMIC_ENDPOINTS
+    )
+
+
+def url_to_file(url, mimetype):
+    path, _, query = url.partition('?')
+    if not query and os.path.splitext(path)[1]:
+        return path.strip('/')  # already a file name, e.g. /sw.js
+    directory = path.strip('/')
+    name = f'{query}{EXTENSIONS.get(mimetype, "")}' if query else f'index{EXTENSIONS.get(mimetype, "")}'
+    return os.path.join(directory, name) if directory else name
+
+
+def write_file(root, relative_path, data, compress=True):
+    """Write ``data`` plus precompressed copies; returns its manifest entry"""
+    path = os.path.join(root, relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as output:
+        output.write(data)
+
+    entry = {'file': relative_path, 'bytes': len(data), 'sha256': hashlib.sha256(data).hexdigest()}
+    if compress and len(data) >= COMPRESS_MIN_BYTES and os.path.splitext(path)[1] in COMPRESSIBLE_EXTENSIONS:
+        # mtime=0 keeps repeated exports byte-identical
+        variants = {'gzip': ('.gz', gzip.compress(data, 9, mtime=0))}
+        if brotli is not None:
+            variants['br'] = ('.br', brotli.compress(data, quality=11))
+        for encoding, (suffix, compressed) in variants.items():
+            if len(compressed) < len(data):
+                with open(path + suffix, 'wb') as output:
+                    output.write(compressed)
+                entry[f'{encoding}_bytes'] = len(compressed)
+    return entry
+
+
+def freeze_site(output_dir, compress=True):
+    """Render every frozen URL and static/ into ``output_dir``; returns the manifest"""
+    output_dir = os.path.abspath(output_dir)
+    build_dir = f'{output_dir}.building-{os.getpid()}'
+    shutil.rmtree(build_dir, ignore_errors=True)
+    os.makedirs(build_dir)
+
+    urls = frozen_urls()
+    manifest = {
+        'generated_at': datetime.utcnow().isoformat() + 'Z',
+        'variant': 'full',  # rendered without client hints; see client_hints.py
+        'routes': {},
+        'static': {},
+        'dynamic': sorted(str(rule) for rule in app.url_map.iter_rules() if rule.endpoint in DYNAMIC_ENDPOINTS)
+        + DYNAMIC_QUERIES,
+    }
+    try:
+        client = app.test_client()
+        for url in urls:
+            response = client.get(url)
+            if response.status_code != 200:
+                raise click.ClickException(f'GET {url} returned {response.status_code}')
+            entry = write_file(build_dir, url_to_file(url, response.mimetype), response.get_data(), compress)
+            entry['content_type'] = response.content_type
+            manifest['routes'][url] = entry
+
+        for directory, _, files in os.walk(app.static_folder):
+            for filename in sorted(files):
+                source = os.path.join(directory, filename)
+                relative = os.path.join('static', os.path.relpath(source, app.static_folder))
+                with open(source, 'rb') as static_file:
+                    manifest['static']['/' + relative.replace(os.sep, '/')] = \
+                        write_file(build_dir, relative, static_file.read(), compress)
+
+        with open(os.path.join(build_dir, 'manifest.json'), 'w') as output:
+            json.dump(manifest, output, indent=2, sort_keys=True)
+    except BaseException:
+        shutil.rmtree(build_dir, ignore_errors=True)
+        raise
+
+    # Swap the finished export in; the old one is removed afterwards
+    previous = f'{output_dir}.previous-{os.getpid()}'
+    if os.path.exists(output_dir):
+        os.rename(output_dir, previous)
+    os.rename(build_dir, output_dir)
+    shutil.rmtree(previous, ignore_errors=True)
+    return manifest
+
+
+@app.cli.command('freeze')
+@click.argument('output_dir', default='build/static-site')
+@click.option('--no-compress', is_flag=True, help='Skip the precompressed .gz/.br copies.')
+def freeze_command(output_dir, no_compress):
+    """Render the site and read-only API into OUTPUT_DIR for a static server."""
+    missing = unfrozen_endpoints(frozen_urls())
+    if missing:
+        raise click.ClickException(
+            f'GET endpoints neither frozen nor listed in DYNAMIC_ENDPOINTS: {", ".join(missing)}')
+    manifest = freeze_site(output_dir, compress=not no_compress)
+    total = sum(entry['bytes'] for entry in manifest['routes'].values())
+    click.echo(f'Froze {len(manifest["routes"])} URLs ({total / 1024:.0f} KiB) and '
+               f'{len(manifest["static"])} static files into {output_dir}')
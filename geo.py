@@ -0,0 +1,393 @@
+"""Spatial index and map clustering for testimonial locations.
+
+Every ``Testimonial`` with coordinates carries a geohash, kept in sync by
+mapper events. ``GeoCluster`` holds precomputed counts and centroids for
+each geohash cell at precisions 1-6. Flushes that add, move or delete
+testimonials update it incrementally, so ``/api/testimonials/geo`` never
+aggregates at request time. Three query modes are served from here:
+
+- ``bbox``: the points inside a bounding box, using the (latitude, longitude) index
+- ``near``: the nearest N points, found by searching an expanding box
+- ``zoom``: the precomputed clusters for a map zoom level
+
+``flask --app main rebuild-geo-index`` recomputes everything from scratch.
+"""
+import math
+from collections import defaultdict
+
+import click
+from sqlalchemy import and_, bindparam, delete, event, func, insert, literal, or_, select, update
+from sqlalchemy.orm import attributes
+
+from app import app, db
+from models import Testimonial, GeoCluster
+from queries import serialize_testimonial
+
+GEOHASH_PRECISION = 12
+# Cluster precisions kept in GeoCluster; cell sizes run from ~5000 km down to ~1 km
+CLUSTER_PRECISIONS = range(1, 7)
+EARTH_RADIUS_KM = 6371.0088
+MAX_GEO_LIMIT = 5000
+DEFAULT_BBOX_LIMIT = 500
+DEFAULT_NEAR_LIMIT = 10
+MAX_NEAR_LIMIT = 100
+MAX_NEAR_ROUNDS = 8  # box expansions before nearest-N falls back to a full scan
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def geohash_encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Encode a coordinate as a geohash string"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        value, bounds = (longitude, lon_range) if even else (latitude, lat_range)
+        mid = (bounds[0] + bounds[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            bounds[0] = mid
+        else:
+            bounds[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two coordinates in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def zoom_precision(zoom):
+    """Geohash precision whose cells suit a web-map zoom level"""
+    if zoom <= 2:
+        return 1
+    if zoom <= 4:
+        return 2
+    if zoom <= 7:
+        return 3
+    if zoom <= 10:
+        return 4
+    if zoom <= 13:
+        return 5
+    return 6
+
+
+def _has_coordinates(latitude, longitude):
+    return latitude is not None and longitude is not None
+
+
+# ------------------------------------------------------------ index upkeep
+
+@event.listens_for(Testimonial, 'before_insert')
+@event.listens_for(Testimonial, 'before_update')
+def _set_geohash(mapper, connection, target):
+    if _has_coordinates(target.latitude, target.longitude):
+        target.geohash = geohash_encode(target.latitude, target.longitude)
+    else:
+        target.geohash = None
+
+
+def _old_location(testimonial):
+    """(geohash, latitude, longitude) as last loaded from the database"""
+    values = []
+    for key in ('geohash', 'latitude', 'longitude'):
+        history = attributes.get_history(testimonial, key)
+        if history.deleted:
+            values.append(history.deleted[0])
+        elif history.unchanged:
+            values.append(history.unchanged[0])
+        else:
+            values.append(None)
+    return tuple(values)
+
+
+def _add_delta(deltas, geohash, latitude, longitude, sign):
+    if not geohash or not _has_coordinates(latitude, longitude):
+        return
+    for precision in CLUSTER_PRECISIONS:
+        delta = deltas[(precision, geohash[:precision])]
+        delta[0] += sign
+        delta[1] += sign * latitude
+        delta[2] += sign * longitude
+
+
+def apply_cluster_deltas(connection, deltas):
+    """Fold {(precision, cell): [count, lat_sum, lon_sum]} changes into GeoCluster"""
+    deltas = {key: delta for key, delta in deltas.items() if delta[0] or delta[1] or delta[2]}
+    if not deltas:
+        return
+
+    by_precision = defaultdict(list)
+    for precision, cell in deltas:
+        by_precision[precision].append(cell)
+    existing = set()
+    for precision, cells in by_precision.items():
+        existing.update(connection.execute(
+            select(GeoCluster.precision, GeoCluster.cell)
+            .where(GeoCluster.precision == precision, GeoCluster.cell.in_(cells))
+        ).tuples())
+
+    updates = [{'b_precision': precision, 'b_cell': cell, 'd_count': d[0], 'd_lat': d[1], 'd_lon': d[2]}
+               for (precision, cell), d in deltas.items() if (precision, cell) in existing]
+    inserts = [{'precision': precision, 'cell': cell, 'count': d[0], 'lat_sum': d[1], 'lon_sum': d[2],
+                'latitude': d[1] / d[0] if d[0] else None, 'longitude': d[2] / d[0] if d[0] else None}
+               for (precision, cell), d in deltas.items() if (precision, cell) not in existing]
+
+    if updates:
+        new_count = func.nullif(GeoCluster.count + bindparam('d_count'), 0)
+        connection.execute(
+            update(GeoCluster)
+            .where(GeoCluster.precision == bindparam('b_precision'), GeoCluster.cell == bindparam('b_cell'))
+            .values(
+                count=GeoCluster.count + bindparam('d_count'),
+                lat_sum=GeoCluster.lat_sum + bindparam('d_lat'),
+                lon_sum=GeoCluster.lon_sum + bindparam('d_lon'),
+                latitude=(GeoCluster.lat_sum + bindparam('d_lat')) / new_count,
+                longitude=(GeoCluster.lon_sum + bindparam('d_lon')) / new_count,
+            ),
+            updates,
+        )
+    if inserts:
+        connection.execute(insert(GeoCluster), inserts)
+    connection.execute(delete(GeoCluster).where(GeoCluster.count <= 0))
+
+
+@event.listens_for(db.session, 'after_flush')
+def _update_clusters(session, flush_context):
+    deltas = defaultdict(lambda: [0, 0.0, 0.0])
+    for obj in session.new:
+        if isinstance(obj, Testimonial):
+            _add_delta(deltas, obj.geohash, obj.latitude, obj.longitude, 1)
+    for obj in session.dirty:
+        if isinstance(obj, Testimonial):
+            old = _old_location(obj)
+            new = (obj.geohash, obj.latitude, obj.longitude)
+            if old != new:
+                _add_delta(deltas, *old, -1)
+                _add_delta(deltas, *new, 1)
+    for obj in session.deleted:
+        if isinstance(obj, Testimonial):
+            _add_delta(deltas, *_old_location(obj), -1)
+    if deltas:
+        apply_cluster_deltas(session.connection(), deltas)
+
+
+def rebuild_geo_index():
+    """Recompute every testimonial geohash and all clusters; returns the point count"""
+    rows = db.session.execute(
+        select(Testimonial.id, Testimonial.latitude, Testimonial.longitude, Testimonial.geohash)
+    ).all()
+    changes = []
+    for row in rows:
+        geohash = geohash_encode(row.latitude, row.longitude) \
+            if _has_coordinates(row.latitude, row.longitude) else None
+        if geohash != row.geohash:
+            changes.append({'id': row.id, 'geohash': geohash})
+    if changes:
+        # Bulk UPDATE by primary key; no flush events fire, clusters are rebuilt below
+        db.session.execute(update(Testimonial), changes)
+
+    db.session.execute(delete(GeoCluster))
+    located = Testimonial.geohash.isnot(None)
+    for precision in CLUSTER_PRECISIONS:
+        cell = func.substr(Testimonial.geohash, 1, precision)
+        db.session.execute(insert(GeoCluster).from_select(
+            ['precision', 'cell', 'count', 'lat_sum', 'lon_sum', 'latitude', 'longitude'],
+            select(
+                literal(precision), cell, func.count(Testimonial.id),
+                func.sum(Testimonial.latitude), func.sum(Testimonial.longitude),
+                func.avg(Testimonial.latitude), func.avg(Testimonial.longitude),
+            ).where(located).group_by(cell)
+        ))
+    db.session.commit()
+    return sum(1 for row in rows if _has_coordinates(row.latitude, row.longitude))
+
+
+def geo_index_stale():
+    """True when located testimonials are missing geohashes or clusters"""
+    missing_hash = db.session.execute(
+        select(Testimonial.id).where(
+            Testimonial.latitude.isnot(None), Testimonial.longitude.isnot(None),
+            Testimonial.geohash.is_(None),
+        ).limit(1)
+    ).first()
+    if missing_hash:
+        return True
+    has_points = db.session.execute(select(Testimonial.id).where(Testimonial.geohash.isnot(None)).limit(1)).first()
+    has_clusters = db.session.execute(select(GeoCluster.cell).limit(1)).first()
+    return bool(has_points) and not has_clusters
+
+
+@app.cli.command('rebuild-geo-index')
+def rebuild_geo_index_command():
+    """Recompute testimonial geohashes and map clusters."""
+    click.echo(f'Indexed {rebuild_geo_index()} located testimonial(s)')
+
+
+# ----------------------------------------------------------------- queries
+
+def _parse_floats(value, count, field):
+    try:
+        numbers = [float(part) for part in value.split(',')]
+    except ValueError:
+        numbers = []
+    if len(numbers) != count or not all(math.isfinite(n) for n in numbers):
+        raise ValueError(f'{field} must be {count} comma-separated numbers')
+    return numbers
+
+
+def _check_coordinate(latitude, longitude, field):
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError(f'{field} is outside the valid latitude/longitude range')
+
+
+def _parse_limit(args, default, maximum):
+    try:
+        limit = int(args.get('limit', default))
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    return max(1, min(limit, maximum))
+
+
+def parse_bbox(value):
+    """Parse ``minLon,minLat,maxLon,maxLat``; minLon > maxLon crosses the antimeridian"""
+    min_lon, min_lat, max_lon, max_lat = _parse_floats(value, 4, 'bbox')
+    _check_coordinate(min_lat, min_lon, 'bbox')
+    _check_coordinate(max_lat, max_lon, 'bbox')
+    if min_lat > max_lat:
+        raise ValueError('bbox minLat must not exceed maxLat')
+    return min_lon, min_lat, max_lon, max_lat
+
+
+def _box_condition(lat_column, lon_column, min_lon, min_lat, max_lon, max_lat):
+    # Latitude leads the composite index, so it is always the range scan
+    conditions = [lat_column.between(min_lat, max_lat)]
+    if min_lon <= max_lon:
+        conditions.append(lon_column.between(min_lon, max_lon))
+    else:
+        conditions.append(or_(lon_column >= min_lon, lon_column <= max_lon))
+    return and_(*conditions)
+
+
+def testimonials_in_bbox(bbox, limit):
+    """Testimonials inside ``bbox``, plus whether ``limit`` cut the result short"""
+    rows = db.session.execute(
+        select(Testimonial)
+        .where(_box_condition(Testimonial.latitude, Testimonial.longitude, *bbox))
+        .order_by(Testimonial.id)
+        .limit(limit + 1)
+    ).scalars().all()
+    return [serialize_testimonial(t) for t in rows[:limit]], len(rows) > limit
+
+
+def _search_box(latitude, longitude, radius_km):
+    """Bounding box (or None for "everywhere") containing the circle of ``radius_km``"""
+    if radius_km >= math.pi * EARTH_RADIUS_KM:
+        return None  # half the circumference reaches every point on the globe
+    d_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = latitude - d_lat, latitude + d_lat
+    if min_lat <= -90 and max_lat >= 90:
+        return None
+    if min_lat <= -90 or max_lat >= 90:
+        # The circle reaches a pole, so every longitude is in range
+        return -180.0, max(min_lat, -90.0), 180.0, min(max_lat, 90.0)
+    d_lon = math.degrees(math.asin(min(1.0, math.sin(math.radians(d_lat)) / math.cos(math.radians(latitude)))))
+    min_lon, max_lon = longitude - d_lon, longitude + d_lon
+    if min_lon < -180:
+        min_lon += 360
+    if max_lon > 180:
+        max_lon -= 360
+    return min_lon, min_lat, max_lon, max_lat
+
+
+def nearest_testimonials(latitude, longitude, limit, initial_radius_km=50.0):
+    """The ``limit`` testimonials closest to a point, each with ``distance_km``"""
+    located = and_(Testimonial.latitude.isnot(None), Testimonial.longitude.isnot(None))
+    radius = initial_radius_km
+    for search_round in range(1, MAX_NEAR_ROUNDS + 1):
+        # The last round scans every located row, so fewer than ``limit`` rows still ends the search
+        box = _search_box(latitude, longitude, radius) if search_round < MAX_NEAR_ROUNDS else None
+        condition = located if box is None else and_(
+            located, _box_condition(Testimonial.latitude, Testimonial.longitude, *box))
+        # Rank on coordinates only; full rows are loaded for the winners alone
+        candidates = db.session.execute(
+            select(Testimonial.id, Testimonial.latitude, Testimonial.longitude).where(condition)
+        ).tuples()
+        ranked = sorted(
+            (haversine_km(latitude, longitude, lat, lon), id_) for id_, lat, lon in candidates
+        )
+        # The box holds every point within ``radius``; anything farther may be missing
+        if box is None or (len(ranked) >= limit and ranked[limit - 1][0] <= radius):
+            break
+        radius = radius * 4 if len(ranked) < limit else ranked[limit - 1][0]
+
+    ranked = ranked[:limit]
+    testimonials = {t.id: t for t in db.session.execute(
+        select(Testimonial).where(Testimonial.id.in_([id_ for _, id_ in ranked]))
+    ).scalars()}
+    results = []
+    for distance, id_ in ranked:
+        data = serialize_testimonial(testimonials[id_])
+        data['distance_km'] = round(distance, 3)
+        results.append(data)
+    return results
+
+
+def clusters_for_zoom(zoom, bbox=None, limit=MAX_GEO_LIMIT):
+    """Precomputed clusters for a zoom level, optionally restricted to ``bbox``"""
+    precision = zoom_precision(zoom)
+    stmt = select(GeoCluster).where(GeoCluster.precision == precision)
+    if bbox is not None:
+        stmt = stmt.where(_box_condition(GeoCluster.latitude, GeoCluster.longitude, *bbox))
+    clusters = db.session.execute(stmt.order_by(GeoCluster.count.desc()).limit(limit + 1)).scalars().all()
+    return precision, [{
+        'geohash': c.cell,
+        'count': c.count,
+        'latitude': c.latitude,
+        'longitude': c.longitude,
+    } for c in clusters[:limit]], len(clusters) > limit
+
+
+def geo_query(args):
+    """Dispatch a /api/testimonials/geo request; raises ValueError on bad input"""
+    bbox = parse_bbox(args['bbox']) if args.get('bbox') else None
+
+    if args.get('near'):
+        latitude, longitude = _parse_floats(args['near'], 2, 'near')
+        _check_coordinate(latitude, longitude, 'near')
+        limit = _parse_limit(args, DEFAULT_NEAR_LIMIT, MAX_NEAR_LIMIT)
+        results = nearest_testimonials(latitude, longitude, limit)
+        return {'mode': 'near', 'count': len(results), 'testimonials': results}
+
+    if args.get('zoom') is not None:
+        try:
+            zoom = int(args['zoom'])
+        except ValueError:
+            raise ValueError('zoom must be an integer')
+        if not 0 <= zoom <= 22:
+            raise ValueError('zoom must be between 0 and 22')
+        limit = _parse_limit(args, MAX_GEO_LIMIT, MAX_GEO_LIMIT)
+        precision, clusters, truncated = clusters_for_zoom(zoom, bbox, limit)
+        return {'mode': 'clusters', 'zoom': zoom, 'precision': precision,
+                'count': len(clusters), 'truncated': truncated, 'clusters': clusters}
+
+    if bbox is not None:
+        limit = _parse_limit(args, DEFAULT_BBOX_LIMIT, MAX_GEO_LIMIT)
+        results, truncated = testimonials_in_bbox(bbox, limit)
+        return {'mode': 'bbox', 'count': len(results), 'truncated': truncated, 'testimonials': results}
+
+    raise ValueError('one of bbox, near or zoom is required')
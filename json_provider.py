@@ -0,0 +1,76 @@
+"""Fast JSON provider for every Flask JSON response.
+
+Uses orjson when it is installed and falls back to the stdlib ``json``
+module otherwise. Both backends serialize the same extra types, so views
+can return them without formatting by hand:
+
+- ``datetime`` and ``date`` as ISO 8601 strings (Flask's default would
+  emit RFC 822 HTTP dates)
+- SQLAlchemy ``Row`` objects as ``{column: value}`` dicts
+- mapped model instances as dicts of their column attributes
+
+Output keeps Flask's sorted keys and compact separators. orjson writes
+UTF-8 directly instead of ``\\uXXXX`` escapes, which is equivalent JSON.
+"""
+import json
+from datetime import date, datetime
+
+from flask.json.provider import DefaultJSONProvider, _default as flask_default
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import DeclarativeBase
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def _default(obj):
+    """Serialize the types json/orjson do not handle natively"""
+    if isinstance(obj, Row):
+        return obj._asdict()
+    if isinstance(obj, DeclarativeBase):
+        return {attr.key: getattr(obj, attr.key) for attr in sa_inspect(obj).mapper.column_attrs}
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    return flask_default(obj)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    default = staticmethod(_default)
+
+    def _orjson_options(self, indent=None, sort_keys=None):
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys if sort_keys is None else sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps_bytes(self, obj, indent=None):
+        """Serialize ``obj`` straight to UTF-8 bytes"""
+        if orjson is not None:
+            return orjson.dumps(obj, default=self.default, option=self._orjson_options(indent))
+        return self.dumps(obj, indent=indent, separators=None if indent else (',', ':')).encode()
+
+    def dumps(self, obj, **kwargs):
+        # Anything orjson cannot express (custom separators, ensure_ascii, cls=...)
+        # goes through the stdlib path with the same default handler.
+        if orjson is not None and set(kwargs) <= {'indent', 'separators', 'sort_keys'}:
+            options = self._orjson_options(kwargs.get('indent'), kwargs.get('sort_keys'))
+            return orjson.dumps(obj, default=self.default, option=options).decode()
+        kwargs.setdefault('default', self.default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = 2 if (self.compact is None and self._app.debug) or self.compact is False else None
+        return self._app.response_class(self.dumps_bytes(obj, indent) + b'\n', mimetype=self.mimetype)
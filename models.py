@@ -1,5 +1,7 @@
 from app import db
 from datetime import datetime
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import column_property
 import json
 
 class Project(db.Model):
@@ -29,19 +31,71 @@ class Testimonial(db.Model):
     content = db.Column(db.Text, nullable=False)
     avatar_url = db.Column(db.String(200))
     location = db.Column(db.String(100))
-    latitude = db.Column(db.Float)
-    longitude = db.Column(db.Float)
+    # active_history keeps the old values of expired instances for geo.py's cluster deltas
+    latitude = column_property(db.Column(db.Float), active_history=True)
+    longitude = column_property(db.Column(db.Float), active_history=True)
+    geohash = column_property(db.Column(db.String(12), index=True), active_history=True)  # from latitude/longitude
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_testimonial_lat_lon', 'latitude', 'longitude'),
+    )
+
+class GeoCluster(db.Model):
+    """Precomputed testimonial counts per geohash cell, one row per (precision, cell)"""
+    precision = db.Column(db.Integer, primary_key=True)
+    cell = db.Column(db.String(12), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    lat_sum = db.Column(db.Float, nullable=False, default=0.0)
+    lon_sum = db.Column(db.Float, nullable=False, default=0.0)
+    latitude = db.Column(db.Float)  # centroid of the testimonials in the cell
+    longitude = db.Column(db.Float)
+
+    __table_args__ = (
+        db.Index('ix_geo_cluster_precision_lat_lon', 'precision', 'latitude', 'longitude'),
+    )
+
 class Timeline(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     company = db.Column(db.String(100))
     description = db.Column(db.Text)
-    start_date = db.Column(db.Date, nullable=False)
-    end_date = db.Column(db.Date)
+    start_date = db.Column(db.Date, nullable=False, index=True)
+    end_date = db.Column(db.Date, index=True)
     category = db.Column(db.String(50))  # job, education, certification, etc.
     current = db.Column(db.Boolean, default=False)
+    duration_days = db.Column(db.Integer)  # end_date - start_date, NULL while ongoing
+
+    __table_args__ = (
+        db.Index('ix_timeline_category_start', 'category', 'start_date'),
+    )
+
+def timeline_duration(start_date, end_date):
+    """Whole days from start_date to end_date, or None for an ongoing entry"""
+    if start_date is None or end_date is None:
+        return None
+    return max((end_date - start_date).days, 0)
+
+@event.listens_for(Timeline, 'before_insert')
+@event.listens_for(Timeline, 'before_update')
+def _set_timeline_duration(mapper, connection, target):
+    target.duration_days = timeline_duration(target.start_date, target.end_date)
+
+def backfill_timeline_durations():
+    """Fill duration_days for finished entries written before the column existed"""
+    rows = db.session.execute(
+        select(Timeline.id, Timeline.start_date, Timeline.end_date)
+        .where(Timeline.end_date.isnot(None), Timeline.duration_days.is_(None))
+    ).all()
+    if rows:
+        db.session.execute(update(Timeline), [
+            {'id': row.id, 'duration_days': timeline_duration(row.start_date, row.end_date)} for row in rows
+        ])
+        db.session.commit()
+    return len(rows)
+
+# 'held' is the spam filter's verdict; 'spam' and the rest are set by the owner
+CONTACT_STATUSES = ('new', 'notified', 'read', 'replied', 'archived', 'spam', 'held')
 
 class Contact(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -49,8 +103,9 @@ class Contact(db.Model):
     email = db.Column(db.String(120), nullable=False)
     subject = db.Column(db.String(200))
     message = db.Column(db.Text, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    status = db.Column(db.String(20), default='new')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    status = db.Column(db.String(20), default='new', index=True)  # one of CONTACT_STATUSES
+    spam_score = db.Column(db.Float)  # spam_filter.py probability; NULL when unscored
 
 class Stats(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -70,6 +125,26 @@ class Achievement(db.Model):
     badge_color = db.Column(db.String(20))  # Color theme for the achievement
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+class ChangeLog(db.Model):
+    """One entry per insert, update or delete of a synced row; the id is the sync cursor, see changes.py"""
+    id = db.Column(db.Integer, primary_key=True)
+    collection = db.Column(db.String(20), nullable=False)
+    row_id = db.Column(db.Integer)  # NULL with op='refetch': bulk change to the whole collection
+    op = db.Column(db.String(10), nullable=False)  # upsert, delete or refetch
+    changed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    __table_args__ = (
+        db.Index('ix_change_log_collection_row', 'collection', 'row_id'),
+        {'sqlite_autoincrement': True},  # never reuse cursors after compaction empties the table
+    )
+
+class ChangeLogCompaction(db.Model):
+    """Compaction runs; cursors below the highest horizon have lost entries and must resync"""
+    id = db.Column(db.Integer, primary_key=True)
+    horizon = db.Column(db.Integer, nullable=False)
+    removed = db.Column(db.Integer, nullable=False, default=0)
+    compacted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
 def init_sample_data():
     """Initialize the database with sample portfolio data"""
     
@@ -0,0 +1,331 @@
+"""On-demand statistical profiling of individual requests.
+
+A request is profiled when it carries a valid ``X-Profile`` header signed
+with ``PROFILE_SECRET`` (see ``flask --app main profile-header``), or when
+it is picked at random at ``PROFILE_SAMPLE_RATE``. A low rate such as 0.01
+is cheap enough to leave on in production, because unprofiled requests only
+pay for a random() call.
+
+While a request is profiled, a background thread samples its Python stack
+every ``PROFILE_INTERVAL_MS``. SQL statements running at sample time appear
+as a leaf ``SQL: ...`` frame, so database time shows up in the flame graph
+next to the Python code that issued it. Each profile is saved to
+``PROFILE_DIR`` in two files:
+
+- ``<id>.speedscope.json``, which opens in https://www.speedscope.app
+- ``<id>.folded``, collapsed stacks for flamegraph.pl or inferno
+
+Only the newest ``PROFILE_KEEP`` profiles are kept. The profile id is returned
+in the ``X-Profile-Id`` response header. Sync WSGI requests only; the async
+read path in asgi.py is not sampled.
+"""
+import hashlib
+import hmac
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+
+import click
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app import app
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+SIGNATURE_MAX_AGE = 300  # seconds a signed X-Profile header stays valid
+MAX_SAMPLES = 100_000
+SQL_LABEL_LENGTH = 120
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def profile_signature(secret, method, path, timestamp=None):
+    """Value for the X-Profile header that profiles ``method path``"""
+    timestamp = int(time.time() if timestamp is None else timestamp)
+    digest = hmac.new(secret.encode(), f'{timestamp}:{method}:{path}'.encode(), hashlib.sha256).hexdigest()
+    return f'{timestamp}.{digest}'
+
+
+def verify_signature(secret, header, method, path):
+    timestamp, _, _ = header.partition('.')
+    # isdigit() alone accepts '²' and other non-ASCII digits that int() rejects
+    if not (timestamp.isascii() and timestamp.isdigit()) or abs(time.time() - int(timestamp)) > SIGNATURE_MAX_AGE:
+        return False
+    # Compare bytes: compare_digest rejects non-ASCII str with TypeError
+    return hmac.compare_digest(header.encode(), profile_signature(secret, method, path, int(timestamp)).encode())
+
+
+def profile_name(method, path):
+    """Sortable, filesystem-safe id for a profile, e.g. 20250101T120000000000-GET-api-projects"""
+    slug = re.sub(r'[^A-Za-z0-9]+', '-', path).strip('-') or 'root'
+    return f'{datetime.utcnow():%Y%m%dT%H%M%S%f}-{method}-{slug}'[:120]
+
+
+def _short_path(filename):
+    if filename.startswith(_ROOT):
+        return os.path.relpath(filename, _ROOT)
+    marker = filename.rfind('site-packages')
+    return filename[marker + len('site-packages') + 1:] if marker != -1 else filename
+
+
+class Profile:
+    """Samples collected for one request"""
+
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+        self.started = time.perf_counter()
+        self.last_sample = self.started
+        self.frames = []        # speedscope frame dicts
+        self._frame_index = {}  # code object or SQL label -> index into frames
+        self.samples = []       # stacks of frame indices, root first
+        self.weights = []       # seconds attributed to each sample
+        self.sql = None         # statement running right now, if any
+        self.sql_time = 0.0
+        self.sql_count = 0
+
+    def _index(self, key, name, file=None, line=None):
+        index = self._frame_index.get(key)
+        if index is None:
+            index = self._frame_index[key] = len(self.frames)
+            frame = {'name': name}
+            if file:
+                frame.update(file=file, line=line)
+            self.frames.append(frame)
+        return index
+
+    def add_sample(self, frame, now):
+        if len(self.samples) >= MAX_SAMPLES:
+            return
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(self._index(code, code.co_name, _short_path(code.co_filename), code.co_firstlineno))
+            frame = frame.f_back
+        stack.reverse()
+        sql = self.sql
+        if sql is not None:
+            stack.append(self._index(sql, f'SQL: {sql}'))
+        self.samples.append(stack)
+        self.weights.append(now - self.last_sample)
+        self.last_sample = now
+
+    def speedscope(self, name, duration):
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': name,
+            'exporter': 'portfolio profiler',
+            'shared': {'frames': self.frames},
+            'profiles': [{
+                'type': 'sampled',
+                'name': f'{self.method} {self.path}',
+                'unit': 'milliseconds',
+                'startValue': 0,
+                'endValue': round(duration * 1000, 3),
+                'samples': self.samples,
+                'weights': [round(w * 1000, 3) for w in self.weights],
+            }],
+        }
+
+    def folded(self):
+        totals = {}
+        for stack, weight in zip(self.samples, self.weights):
+            line = ';'.join(self.frames[i]['name'].replace(';', ',') for i in stack)
+            totals[line] = totals.get(line, 0) + weight
+        # Weights in microseconds so short requests still produce integers
+        return ''.join(f'{line} {max(1, round(w * 1e6))}\n' for line, w in sorted(totals.items()))
+
+
+class Sampler:
+    """Background thread that samples the stacks of every profiled thread"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.active = {}  # thread ident -> Profile
+        self._wakeup = threading.Condition()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_thread(self):
+        # Threads do not survive fork; start one per worker process
+        if self._pid != os.getpid() or not self._thread.is_alive():
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+            self._thread.start()
+
+    def start(self, ident, profile):
+        with self._wakeup:
+            self._ensure_thread()
+            self.active[ident] = profile
+            self._wakeup.notify()
+
+    def stop(self, ident):
+        with self._wakeup:
+            return self.active.pop(ident, None)
+
+    def _run(self):
+        while True:
+            with self._wakeup:
+                while not self.active:
+                    self._wakeup.wait()
+                profiles = list(self.active.items())
+            frames = sys._current_frames()
+            now = time.perf_counter()
+            for ident, profile in profiles:
+                frame = frames.get(ident)
+                if frame is not None:
+                    profile.add_sample(frame, now)
+            del frames
+            time.sleep(self.interval)
+
+
+class ProfileStore:
+    """Bounded on-disk ring of saved profiles"""
+
+    def __init__(self, directory, keep):
+        self.directory = directory
+        self.keep = keep
+
+    def save(self, profile, duration, name):
+        os.makedirs(self.directory, exist_ok=True)
+        outputs = {
+            f'{name}.speedscope.json': json.dumps(profile.speedscope(name, duration)),
+            f'{name}.folded': profile.folded(),
+        }
+        for filename, content in outputs.items():
+            path = os.path.join(self.directory, filename)
+            with open(f'{path}.tmp', 'w') as output:
+                output.write(content)
+            os.replace(f'{path}.tmp', path)
+        self.prune()
+
+    def prune(self):
+        names = sorted({f.split('.', 1)[0] for f in os.listdir(self.directory) if not f.endswith('.tmp')})
+        for name in names[:-self.keep] if self.keep else names:
+            for suffix in ('.speedscope.json', '.folded'):
+                try:
+                    os.remove(os.path.join(self.directory, name + suffix))
+                except FileNotFoundError:
+                    pass
+
+
+class RequestProfiler:
+    """WSGI middleware that profiles signed or randomly sampled requests"""
+
+    def __init__(self, wsgi_app, secret=None, sample_rate=0.0, interval=0.001, store=None, logger=None):
+        self.wsgi_app = wsgi_app
+        self.secret = secret
+        self.sample_rate = sample_rate
+        self.sampler = Sampler(interval)
+        self.store = store
+        self.logger = logger
+
+    def wants_profile(self, environ):
+        header = environ.get(PROFILE_HEADER)
+        if header and self.secret:
+            return verify_signature(self.secret, header, environ['REQUEST_METHOD'], environ.get('PATH_INFO', ''))
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def __call__(self, environ, start_response):
+        if not self.wants_profile(environ):
+            return self.wsgi_app(environ, start_response)
+
+        ident = threading.get_ident()
+        profile = Profile(environ['REQUEST_METHOD'], environ.get('PATH_INFO', ''))
+        name = profile_name(profile.method, profile.path)
+
+        def profiled_start_response(status, headers, exc_info=None):
+            return start_response(status, headers + [('X-Profile-Id', name)], exc_info)
+
+        self.sampler.start(ident, profile)
+        try:
+            body = self.wsgi_app(environ, profiled_start_response)
+        except BaseException:
+            self._finish(ident, name)
+            raise
+        # Streamed bodies run in the same thread; keep sampling until close()
+        return _ProfiledBody(body, lambda: self._finish(ident, name))
+
+    def _finish(self, ident, name):
+        profile = self.sampler.stop(ident)
+        if profile is None:
+            return
+        duration = time.perf_counter() - profile.started
+        try:
+            self.store.save(profile, duration, name)
+        except OSError as e:
+            if self.logger:
+                self.logger.warning(f'Could not save profile {name}: {e}')
+            return
+        if self.logger:
+            self.logger.info(
+                f'Profiled {profile.method} {profile.path}: {duration * 1000:.1f} ms, '
+                f'{len(profile.samples)} samples, SQL {profile.sql_time * 1000:.1f} ms '
+                f'in {profile.sql_count} queries -> {name}'
+            )
+
+
+class _ProfiledBody:
+    def __init__(self, body, on_close):
+        self.body = body
+        self.on_close = on_close
+
+    def __iter__(self):
+        return iter(self.body)
+
+    def close(self):
+        try:
+            if hasattr(self.body, 'close'):
+                self.body.close()
+        finally:
+            self.on_close()
+
+
+def _active_profile():
+    return profiler.sampler.active.get(threading.get_ident()) if profiler else None
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _sql_started(conn, cursor, statement, parameters, context, executemany):
+    profile = _active_profile()
+    if profile is not None:
+        profile.sql = ' '.join(statement.split())[:SQL_LABEL_LENGTH]
+        conn.info['profile_sql_started'] = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _sql_finished(conn, cursor, statement, parameters, context, executemany):
+    profile = _active_profile()
+    started = conn.info.pop('profile_sql_started', None)
+    if profile is not None and started is not None:
+        profile.sql = None
+        profile.sql_time += time.perf_counter() - started
+        profile.sql_count += 1
+
+
+profiler = None
+if app.config['PROFILE_SECRET'] or app.config['PROFILE_SAMPLE_RATE']:
+    profiler = RequestProfiler(
+        app.wsgi_app,
+        secret=app.config['PROFILE_SECRET'],
+        sample_rate=app.config['PROFILE_SAMPLE_RATE'],
+        interval=app.config['PROFILE_INTERVAL_MS'] / 1000,
+        store=ProfileStore(app.config['PROFILE_DIR'] or os.path.join(app.instance_path, 'profiles'),
+                           app.config['PROFILE_KEEP']),
+        logger=app.logger,
+    )
+    app.wsgi_app = profiler
+
+
+@app.cli.command('profile-header')
+@click.argument('path')
+@click.option('--method', default='GET', show_default=True)
+def profile_header_command(path, method):
+    """Print a signed X-Profile header for PATH (valid for 5 minutes)."""
+    if not app.config['PROFILE_SECRET']:
+        raise click.ClickException('PROFILE_SECRET is not configured')
+    click.echo(f'X-Profile: {profile_signature(app.config["PROFILE_SECRET"], method.upper(), path)}')
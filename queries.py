@@ -0,0 +1,261 @@
+"""Statements and serializers for the read-only public API.
+
+Each endpoint is split into a ``select()`` built from the request arguments
+and a function that shapes the fetched rows into the JSON payload. The sync
+Flask views in routes.py and the async read path in asgi.py share them, so
+both return byte-identical responses.
+"""
+import json
+from datetime import date
+
+from sqlalchemy import Date, func, literal, or_, select, union_all
+
+from models import Project, Skill, Testimonial, Timeline, Stats, Achievement, timeline_duration
+
+
+def projects_statement(args):
+    category = args.get('category')
+    featured_only = args.get('featured', '').lower() == 'true'
+
+    stmt = select(Project)
+    if category:
+        stmt = stmt.where(Project.category == category)
+    if featured_only:
+        stmt = stmt.where(Project.featured == True)
+    return stmt.order_by(Project.created_at.desc())
+
+def serialize_project(p):
+    return {
+        'id': p.id,
+        'title': p.title,
+        'description': p.description,
+        'tech_stack': json.loads(p.tech_stack) if p.tech_stack else [],
+        'github_url': p.github_url,
+        'live_url': p.live_url,
+        'image_url': p.image_url,
+        'category': p.category,
+        'featured': p.featured,
+        'created_at': p.created_at
+    }
+
+def shape_projects(projects):
+    return [serialize_project(p) for p in projects]
+
+
+def skills_statement(args):
+    return select(Skill)
+
+def serialize_skill(skill):
+    return {
+        'id': skill.id,
+        'name': skill.name,
+        'proficiency': skill.proficiency,
+        'years_experience': skill.years_experience
+    }
+
+def shape_skills(skills):
+    # Group skills by category
+    skills_by_category = {}
+    for skill in skills:
+        if skill.category not in skills_by_category:
+            skills_by_category[skill.category] = []
+        skills_by_category[skill.category].append(serialize_skill(skill))
+    return skills_by_category
+
+
+def testimonials_statement(args):
+    return select(Testimonial).order_by(Testimonial.created_at.desc())
+
+def serialize_testimonial(t):
+    return {
+        'id': t.id,
+        'name': t.name,
+        'company': t.company,
+        'position': t.position,
+        'content': t.content,
+        'avatar_url': t.avatar_url,
+        'location': t.location,
+        'latitude': t.latitude,
+        'longitude': t.longitude,
+        'created_at': t.created_at
+    }
+
+def shape_testimonials(testimonials):
+    return [serialize_testimonial(t) for t in testimonials]
+
+
+def parse_date(value, field):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'{field} must be an ISO 8601 date (YYYY-MM-DD)')
+
+def _active_between(start, end):
+    """Entries whose [start_date, end_date] interval overlaps [start, end]; open ends are unbounded"""
+    conditions = []
+    if end is not None:
+        conditions.append(Timeline.start_date <= end)
+    if start is not None:
+        conditions.append(or_(Timeline.end_date.is_(None), Timeline.end_date >= start))
+    return conditions
+
+def timeline_statement(args):
+    """Timeline entries, optionally active at a date or overlapping a date range
+
+    ``active_at=YYYY-MM-DD`` keeps entries running on that day; ``from`` and/or
+    ``to`` keep entries overlapping that range. Raises ValueError on bad dates.
+    """
+    stmt = select(Timeline)
+    if args.get('category'):
+        stmt = stmt.where(Timeline.category == args['category'])
+    if args.get('active_at'):
+        day = parse_date(args['active_at'], 'active_at')
+        stmt = stmt.where(*_active_between(day, day))
+    if args.get('from') or args.get('to'):
+        start = parse_date(args['from'], 'from') if args.get('from') else None
+        end = parse_date(args['to'], 'to') if args.get('to') else None
+        if start and end and start > end:
+            raise ValueError('from must not be after to')
+        stmt = stmt.where(*_active_between(start, end))
+    return stmt.order_by(Timeline.start_date.desc())
+
+def serialize_timeline(t):
+    return {
+        'id': t.id,
+        'title': t.title,
+        'company': t.company,
+        'description': t.description,
+        'start_date': t.start_date,
+        'end_date': t.end_date,
+        'category': t.category,
+        'current': t.current,
+        # Stored for finished entries; ongoing ones count up to today
+        'duration_days': t.duration_days if t.end_date else timeline_duration(t.start_date, date.today())
+    }
+
+def shape_timeline(timeline_items):
+    return [serialize_timeline(t) for t in timeline_items]
+
+def timeline_experience_statement():
+    """One row per category for finished entries plus one per ongoing entry"""
+    finished = select(
+        Timeline.category,
+        func.count(Timeline.id).label('entries'),
+        func.sum(Timeline.duration_days).label('days'),
+        func.min(Timeline.start_date).label('first_start'),
+        func.max(Timeline.end_date).label('last_end'),
+        literal(None, Date).label('open_start'),
+    ).where(Timeline.end_date.isnot(None)).group_by(Timeline.category)
+    ongoing = select(
+        Timeline.category,
+        literal(1),
+        literal(0),
+        Timeline.start_date,
+        literal(None, Date),
+        Timeline.start_date,
+    ).where(Timeline.end_date.is_(None))
+    return union_all(finished, ongoing)
+
+def shape_timeline_experience(rows, today):
+    """Total experience per category, counting ongoing entries up to ``today``"""
+    experience = {}
+    for row in rows:
+        summary = experience.setdefault(row.category, {
+            'entries': 0, 'current': 0, 'total_days': 0, 'first_start': None, 'last_end': None
+        })
+        summary['entries'] += row.entries
+        if row.open_start is not None:
+            summary['current'] += 1
+            summary['total_days'] += timeline_duration(row.open_start, today)
+        else:
+            summary['total_days'] += row.days or 0
+            summary['last_end'] = max(filter(None, (summary['last_end'], row.last_end)))
+        summary['first_start'] = min(filter(None, (summary['first_start'], row.first_start)))
+
+    for summary in experience.values():
+        if summary['current']:
+            summary['last_end'] = None  # still running
+        summary['years'] = round(summary['total_days'] / 365.25, 1)
+    return experience
+
+
+def stats_statement(args):
+    return select(Stats)
+
+def serialize_stat(s):
+    return {
+        'metric_name': s.metric_name,
+        'metric_value': s.metric_value,
+        'metric_label': s.metric_label,
+        'updated_at': s.updated_at
+    }
+
+def shape_stats(stats):
+    return [serialize_stat(s) for s in stats]
+
+
+def achievements_statement(args):
+    return select(Achievement).order_by(Achievement.date_achieved.desc())
+
+def serialize_achievement(achievement):
+    return {
+        'id': achievement.id,
+        'title': achievement.title,
+        'organization': achievement.organization,
+        'description': achievement.description,
+        'date_achieved': achievement.date_achieved,
+        'icon': achievement.icon,
+        'badge_color': achievement.badge_color
+    }
+
+def shape_achievements(achievements):
+    # Group achievements by category
+    grouped_achievements = {}
+    for achievement in achievements:
+        category = achievement.category
+        if category not in grouped_achievements:
+            grouped_achievements[category] = []
+
+        grouped_achievements[category].append(serialize_achievement(achievement))
+    return grouped_achievements
+
+
+def social_feed():
+    """Social media feed data (placeholder for future implementation)"""
+    # This would typically fetch from external APIs like Twitter/X
+    # For now, returning mock structure
+    return [
+        {
+            'id': 1,
+            'platform': 'twitter',
+            'content': 'Just shipped a new feature using Three.js! The 3D animations turned out amazing.',
+            'timestamp': '2024-01-15T10:30:00Z',
+            'likes': 42,
+            'retweets': 8
+        },
+        {
+            'id': 2,
+            'platform': 'github',
+            'content': 'Pushed latest updates to the portfolio project repository',
+            'timestamp': '2024-01-14T15:45:00Z',
+            'stars': 15
+        }
+    ]
+
+
+# path -> per-row serializer for the list endpoints that can stream as NDJSON
+ROW_SERIALIZERS = {
+    '/api/projects': serialize_project,
+    '/api/testimonials': serialize_testimonial,
+    '/api/timeline': serialize_timeline,
+}
+
+# path -> (statement builder, shaper) for every read-only collection endpoint
+READ_ENDPOINTS = {
+    '/api/projects': (projects_statement, shape_projects),
+    '/api/skills': (skills_statement, shape_skills),
+    '/api/testimonials': (testimonials_statement, shape_testimonials),
+    '/api/timeline': (timeline_statement, shape_timeline),
+    '/api/stats': (stats_statement, shape_stats),
+    '/api/achievements': (achievements_statement, shape_achievements),
+}
@@ -1,112 +1,115 @@
-from flask import render_template, request, jsonify, redirect, url_for, flash, make_response
+from flask import render_template, request, jsonify, redirect, url_for, flash, make_response, Response, stream_with_context
+from sqlalchemy import select, update
 from app import app, db
-from models import Project, Skill, Testimonial, Timeline, Contact, Stats, Achievement
-import json
-from datetime import datetime
+from auth import require_admin_token
+from changes import changes_since
+from client_hints import api_variant, lite_payload, lite_row, page_variant
+from data_version import LocalCache
+from geo import geo_query
+from models import Contact, CONTACT_STATUSES
+import spam_filter
+from queries import READ_ENDPOINTS, ROW_SERIALIZERS, social_feed, timeline_experience_statement, shape_timeline_experience
+import csv
+import io
+from datetime import date, datetime
+
+# Rows fetched per round trip when streaming exports from a server-side cursor
+STREAM_BATCH_SIZE = 500
 
 @app.route('/')
 def index():
     """Main portfolio homepage"""
-    return render_template('index.html')
+    return render_template('index.html', variant=page_variant())
 
 @app.route('/dashboard')
 def dashboard():
     """Interactive dashboard page"""
-    return render_template('dashboard.html')
+    return render_template('dashboard.html', variant=page_variant())
 
 # API Routes
+# Shaped READ_ENDPOINTS payloads, dropped whenever any worker commits a write
+read_cache = LocalCache(maxsize=256 if app.config['READ_CACHE_TTL'] else 0, ttl=app.config['READ_CACHE_TTL'])
+
+def read_cache_key(path, args, variant):
+    return path, variant, tuple(sorted(args.items(multi=True)))
+
+def fetch_read_endpoint(path, args):
+    """Run a READ_ENDPOINTS query on the sync session and shape the result for the client's variant"""
+    variant = api_variant()
+    key = read_cache_key(path, args, variant)
+    payload = read_cache.get(key)
+    if payload is None:
+        statement, shape = READ_ENDPOINTS[path]
+        payload = shape(db.session.execute(statement(args)).scalars().all())
+        if variant == 'lite':
+            payload = lite_payload(path, payload)
+        read_cache.set(key, payload)
+    return payload
+
+def stream_read_endpoint(path, args):
+    """Stream a list endpoint as NDJSON, one row per line, from a server-side cursor"""
+    statement, _ = READ_ENDPOINTS[path]
+    serialize = ROW_SERIALIZERS[path]
+    lite = api_variant() == 'lite'
+    rows = db.session.execute(statement(args).execution_options(yield_per=STREAM_BATCH_SIZE)).scalars()
+    body = _stream_ndjson(lite_row(path, serialize(row)) if lite else serialize(row) for row in rows)
+    return Response(stream_with_context(body), mimetype='application/x-ndjson')
+
+def list_response(path):
+    """JSON array by default, NDJSON stream with ?format=ndjson"""
+    if request.args.get('format') == 'ndjson':
+        return stream_read_endpoint(path, request.args)
+    return jsonify(fetch_read_endpoint(path, request.args))
+
 @app.route('/api/projects')
 def get_projects():
     """Get all projects with optional filtering"""
-    category = request.args.get('category')
-    featured_only = request.args.get('featured', '').lower() == 'true'
-    
-    query = Project.query
-    
-    if category:
-        query = query.filter(Project.category == category)
-    if featured_only:
-        query = query.filter(Project.featured == True)
-    
-    projects = query.order_by(Project.created_at.desc()).all()
-    
-    return jsonify([{
-        'id': p.id,
-        'title': p.title,
-        'description': p.description,
-        'tech_stack': json.loads(p.tech_stack) if p.tech_stack else [],
-        'github_url': p.github_url,
-        'live_url': p.live_url,
-        'image_url': p.image_url,
-        'category': p.category,
-        'featured': p.featured,
-        'created_at': p.created_at.isoformat() if p.created_at else None
-    } for p in projects])
+    return list_response('/api/projects')
 
 @app.route('/api/skills')
 def get_skills():
     """Get all skills grouped by category"""
-    skills = Skill.query.all()
-    
-    # Group skills by category
-    skills_by_category = {}
-    for skill in skills:
-        if skill.category not in skills_by_category:
-            skills_by_category[skill.category] = []
-        skills_by_category[skill.category].append({
-            'id': skill.id,
-            'name': skill.name,
-            'proficiency': skill.proficiency,
-            'years_experience': skill.years_experience
-        })
-    
-    return jsonify(skills_by_category)
+    return jsonify(fetch_read_endpoint('/api/skills', request.args))
 
 @app.route('/api/testimonials')
 def get_testimonials():
     """Get all testimonials"""
-    testimonials = Testimonial.query.order_by(Testimonial.created_at.desc()).all()
-    
-    return jsonify([{
-        'id': t.id,
-        'name': t.name,
-        'company': t.company,
-        'position': t.position,
-        'content': t.content,
-        'avatar_url': t.avatar_url,
-        'location': t.location,
-        'latitude': t.latitude,
-        'longitude': t.longitude,
-        'created_at': t.created_at.isoformat() if t.created_at else None
-    } for t in testimonials])
+    return list_response('/api/testimonials')
+
+@app.route('/api/testimonials/geo')
+def get_testimonials_geo():
+    """Testimonial locations by bounding box, nearest-N or zoom-level clusters"""
+    try:
+        return jsonify(geo_query(request.args))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/changes')
+def get_changes():
+    """Rows changed, deleted or needing a refetch since the ``since`` cursor"""
+    try:
+        return jsonify(changes_since(request.args.get('since')))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
 @app.route('/api/timeline')
 def get_timeline():
-    """Get timeline items"""
-    timeline_items = Timeline.query.order_by(Timeline.start_date.desc()).all()
-    
-    return jsonify([{
-        'id': t.id,
-        'title': t.title,
-        'company': t.company,
-        'description': t.description,
-        'start_date': t.start_date.isoformat() if t.start_date else None,
-        'end_date': t.end_date.isoformat() if t.end_date else None,
-        'category': t.category,
-        'current': t.current
-    } for t in timeline_items])
+    """Get timeline items, optionally active_at a date or overlapping from/to"""
+    try:
+        return list_response('/api/timeline')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/timeline/experience')
+def get_timeline_experience():
+    """Get total experience per timeline category"""
+    rows = db.session.execute(timeline_experience_statement()).all()
+    return jsonify(shape_timeline_experience(rows, date.today()))
 
 @app.route('/api/stats')
 def get_stats():
     """Get portfolio statistics"""
-    stats = Stats.query.all()
-    
-    return jsonify([{
-        'metric_name': s.metric_name,
-        'metric_value': s.metric_value,
-        'metric_label': s.metric_label,
-        'updated_at': s.updated_at.isoformat() if s.updated_at else None
-    } for s in stats])
+    return jsonify(fetch_read_endpoint('/api/stats', request.args))
 
 @app.route('/api/contact', methods=['POST'])
 def submit_contact():
@@ -124,17 +127,40 @@ def submit_contact():
         from email_service import EmailService
         email_service = EmailService()
         
+        spam_score = spam_filter.spam_score(data)
+        
         # Create new contact entry in database
         contact = Contact(
             name=data['name'].strip(),
             email=data['email'].strip(),
             subject=data.get('subject', '').strip(),
-            message=data['message'].strip()
+            message=data['message'].strip(),
+            spam_score=spam_score
         )
+        if spam_filter.is_spam(spam_score):
+            contact.status = 'held'
         
         db.session.add(contact)
         db.session.commit()
         
+        if contact.status == 'held':
+            # Kept for review in the inbox; same reply so senders cannot probe the filter
+            app.logger.info(f"Contact {contact.id} held as suspected spam (score {spam_score:.3f})")
+            return jsonify({
+                'success': True,
+                'message': 'Thank you for your message! I\'ll get back to you soon.'
+            })
+        
+        if app.config['CONTACT_DIGEST_ENABLED']:
+            # Owner notification and auto-reply go out with the next digest
+            from contact_digest import flush_contact_digest
+            flush_contact_digest()
+            
+            return jsonify({
+                'success': True,
+                'message': 'Thank you for your message! I\'ll get back to you soon.'
+            })
+        
         # Send email notification to you
         email_result = email_service.send_contact_notification(data)
         
@@ -144,6 +170,9 @@ def submit_contact():
         if email_result.get('success'):
             app.logger.info(f"Contact notification sent successfully. Email ID: {email_result.get('email_id')}")
             
+            contact.status = 'notified'
+            db.session.commit()
+            
             return jsonify({
                 'success': True,
                 'message': 'Thank you for your message! I\'ll get back to you soon.'
@@ -161,52 +190,180 @@ def submit_contact():
         app.logger.error(f"Contact form error: {str(e)}")
         return jsonify({'error': 'An error occurred while sending your message'}), 500
 
-@app.route('/api/achievements')
-def get_achievements():
-    """Get all achievements grouped by category"""
-    achievements = Achievement.query.order_by(Achievement.date_achieved.desc()).all()
+# Contact inbox (owner only)
+CONTACT_COLUMNS = ('id', 'name', 'email', 'subject', 'message', 'status', 'spam_score', 'created_at')
+
+def serialize_contact(c):
+    return {
+        'id': c.id,
+        'name': c.name,
+        'email': c.email,
+        'subject': c.subject,
+        'message': c.message,
+        'status': c.status,
+        'spam_score': c.spam_score,
+        'created_at': c.created_at
+    }
+
+def _parse_timestamp(value, field):
+    # JSON bodies can carry numbers or lists here, not just query strings
+    if not isinstance(value, str):
+        raise ValueError(f'{field} must be an ISO 8601 date or datetime')
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'{field} must be an ISO 8601 date or datetime')
+
+def contact_filters(args):
+    """Build WHERE clauses from status/since/until arguments"""
+    conditions = []
     
-    # Group achievements by category
-    grouped_achievements = {}
-    for achievement in achievements:
-        category = achievement.category
-        if category not in grouped_achievements:
-            grouped_achievements[category] = []
-        
-        grouped_achievements[category].append({
-            'id': achievement.id,
-            'title': achievement.title,
-            'organization': achievement.organization,
-            'description': achievement.description,
-            'date_achieved': achievement.date_achieved.isoformat() if achievement.date_achieved else None,
-            'icon': achievement.icon,
-            'badge_color': achievement.badge_color
+    statuses = args.get('status')
+    if statuses:
+        if isinstance(statuses, str):
+            statuses = statuses.split(',')
+        if not isinstance(statuses, list) or not all(isinstance(s, str) for s in statuses):
+            raise ValueError('status must be a comma-separated string or a list of strings')
+        unknown = set(statuses) - set(CONTACT_STATUSES)
+        if unknown:
+            raise ValueError(f"Unknown status: {', '.join(sorted(unknown))}")
+        conditions.append(Contact.status.in_(statuses))
+    if args.get('since'):
+        conditions.append(Contact.created_at >= _parse_timestamp(args['since'], 'since'))
+    if args.get('until'):
+        conditions.append(Contact.created_at < _parse_timestamp(args['until'], 'until'))
+    
+    return conditions
+
+def _stream_ndjson(rows):
+    # Rows and datetimes are serialized natively by the app's JSON provider
+    for row in rows:
+        yield app.json.dumps_bytes(row) + b'\n'
+
+def _csv_value(value):
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+def _stream_csv(rows, columns):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for count, row in enumerate(rows, 1):
+        writer.writerow([_csv_value(value) for value in row])
+        if count % STREAM_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+@app.route('/api/contacts')
+@require_admin_token
+def list_contacts():
+    """Page through contact submissions, newest first (keyset on id)"""
+    try:
+        conditions = contact_filters(request.args)
+        limit = min(max(int(request.args.get('limit', 50)), 1), 200)
+        cursor = request.args.get('cursor', type=int)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if cursor is not None:
+        conditions.append(Contact.id < cursor)
+    
+    contacts = db.session.execute(
+        select(Contact).where(*conditions).order_by(Contact.id.desc()).limit(limit + 1)
+    ).scalars().all()
+    
+    has_more = len(contacts) > limit
+    contacts = contacts[:limit]
+    
+    return jsonify({
+        'contacts': [serialize_contact(c) for c in contacts],
+        'next_cursor': contacts[-1].id if has_more else None
+    })
+
+@app.route('/api/contacts/status', methods=['POST'])
+@require_admin_token
+def update_contact_status():
+    """Move contacts to a new status in a single UPDATE.
+
+    Body: ``{"status": "read", "ids": [...]}`` and/or filters
+    ``from_status``, ``since``, ``until``. At least ``ids`` or
+    ``from_status`` is required so a typo cannot rewrite the whole inbox.
+    """
+    data = request.get_json(silent=True) or {}
+    
+    status = data.get('status')
+    if status not in CONTACT_STATUSES:
+        return jsonify({'error': f"status must be one of: {', '.join(CONTACT_STATUSES)}"}), 400
+    
+    ids = data.get('ids')
+    if not ids and not data.get('from_status'):
+        return jsonify({'error': 'ids or from_status is required'}), 400
+    
+    try:
+        conditions = contact_filters({
+            'status': data.get('from_status'),
+            'since': data.get('since'),
+            'until': data.get('until')
         })
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if ids:
+        if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+            return jsonify({'error': 'ids must be a list of integers'}), 400
+        conditions.append(Contact.id.in_(ids))
+    
+    result = db.session.execute(
+        update(Contact).where(*conditions).values(status=status)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    
+    return jsonify({'success': True, 'updated': result.rowcount})
+
+@app.route('/api/contacts/export')
+@require_admin_token
+def export_contacts():
+    """Stream the inbox as NDJSON or CSV without buffering it in memory"""
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({'error': 'format must be ndjson or csv'}), 400
+    
+    try:
+        conditions = contact_filters(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    return jsonify(grouped_achievements)
+    # yield_per streams from a server-side cursor where the driver supports it
+    rows = db.session.execute(
+        select(*(getattr(Contact, column) for column in CONTACT_COLUMNS))
+        .where(*conditions)
+        .order_by(Contact.id)
+        .execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+    
+    timestamp = datetime.utcnow().strftime('%Y%m%d-%H%M%S')
+    if export_format == 'csv':
+        body = _stream_csv(rows, CONTACT_COLUMNS)
+        mimetype = 'text/csv'
+    else:
+        body = _stream_ndjson(rows)
+        mimetype = 'application/x-ndjson'
+    
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=contacts-{timestamp}.{export_format}'
+    return response
+
+@app.route('/api/achievements')
+def get_achievements():
+    """Get all achievements grouped by category"""
+    return jsonify(fetch_read_endpoint('/api/achievements', request.args))
 
 @app.route('/api/social')
 def get_social_feed():
     """Get social media feed data (placeholder for future implementation)"""
-    # This would typically fetch from external APIs like Twitter/X
-    # For now, returning mock structure
-    return jsonify([
-        {
-            'id': 1,
-            'platform': 'twitter',
-            'content': 'Just shipped a new feature using Three.js! The 3D animations turned out amazing.',
-            'timestamp': '2024-01-15T10:30:00Z',
-            'likes': 42,
-            'retweets': 8
-        },
-        {
-            'id': 2,
-            'platform': 'github',
-            'content': 'Pushed latest updates to the portfolio project repository',
-            'timestamp': '2024-01-14T15:45:00Z',
-            'stars': 15
-        }
-    ])
+    return jsonify(social_feed())
 
 @app.route('/download/source')
 def download_source():
@@ -0,0 +1,44 @@
+"""Additive schema upgrades for existing databases.
+
+``db.create_all()`` only creates missing tables. When a model gains a
+column or an index, deployments with an existing database need it added in
+place. upgrade_schema() does that with ``ALTER TABLE ... ADD COLUMN`` and
+``CREATE INDEX``. It never drops or rewrites anything, so running it on
+every start is safe.
+"""
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateIndex
+
+
+def upgrade_schema(engine, metadata):
+    """Add columns and indexes declared in ``metadata`` but missing in the database.
+
+    Returns the list of ``table.column`` / index names that were added.
+    """
+    added = []
+    quote = engine.dialect.identifier_preparer.quote
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+
+    with engine.begin() as connection:
+        for table in metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+
+            existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.exec_driver_sql(
+                    f'ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column_type}'
+                )
+                added.append(f'{table.name}.{column.name}')
+
+            existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    connection.execute(CreateIndex(index))
+                    added.append(index.name)
+
+    return added
@@ -0,0 +1,113 @@
+"""Service worker and precache manifest for offline and repeat visits.
+
+``/precache-manifest.json`` lists every file under ``static/`` with a
+content hash, the pages and ``/api/*`` URLs worth keeping offline, and the
+shared data version from data_version.py. Only writes to the public
+collections move that version, so contact form posts never change the
+worker. ``/sw.js`` embeds that manifest
+in templates/sw.js. The browser re-checks the worker on each navigation,
+so a deploy (new asset hashes) or a content write (new data version)
+changes its bytes and triggers an update:
+
+- assets are served cache-first from a precache named after their hashes
+- pages and API JSON are served stale-while-revalidate and refreshed when
+  the worker updates, from a separate cache per client_hints.py variant
+  so a device that turns on Save-Data never gets the full page it cached
+  earlier
+"""
+import hashlib
+import os
+import threading
+
+from flask import render_template, request
+
+import client_hints
+from app import app
+from data_version import current_version
+from queries import READ_ENDPOINTS
+
+# Pages and public API responses precached for offline use
+PRECACHE_DATA = ['/', '/dashboard', '/api/social', '/api/timeline/experience'] + list(READ_ENDPOINTS)
+# Never answered from the worker's caches
+NETWORK_ONLY_PREFIXES = ['/api/contact', '/api/changes', '/download/', '/sw.js', '/precache-manifest.json']
+
+
+class AssetRevisions:
+    """Content hashes of static files, recomputed only when a file changes"""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self._hashes = {}  # path -> ((mtime, size), hash)
+        self._lock = threading.Lock()
+
+    def _hash(self, path, stat):
+        key = (stat.st_mtime_ns, stat.st_size)
+        cached = self._hashes.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as static_file:
+            for chunk in iter(lambda: static_file.read(65536), b''):
+                digest.update(chunk)
+        revision = digest.hexdigest()[:16]
+        with self._lock:
+            self._hashes[path] = (key, revision)
+        return revision
+
+    def all(self):
+        """[(relative path, revision)] for every static file, sorted"""
+        revisions = []
+        for directory, _, files in os.walk(self.folder):
+            for filename in files:
+                path = os.path.join(directory, filename)
+                relative = os.path.relpath(path, self.folder).replace(os.sep, '/')
+                revisions.append((relative, self._hash(path, os.stat(path))))
+        return sorted(revisions)
+
+
+asset_revisions = AssetRevisions(app.static_folder)
+
+
+def precache_manifest():
+    static_prefix = app.static_url_path.rstrip('/') + '/'
+    assets = [{'url': static_prefix + relative, 'revision': revision}
+              for relative, revision in asset_revisions.all()]
+    assets_revision = hashlib.sha256(
+        ''.join(f'{a["url"]}:{a["revision"]}\n' for a in assets).encode()
+    ).hexdigest()[:16]
+    return {
+        'assets_revision': assets_revision,
+        'assets': assets,
+        'data': PRECACHE_DATA,
+        'data_version': current_version(),  # public content only; see data_version.PUBLIC_MODELS
+        'network_only': NETWORK_ONLY_PREFIXES,
+        'static_prefix': static_prefix,
+        # client_hints.py thresholds, rechecked in the worker to pick a data cache
+        'variants': {
+            'lite_ect': client_hints.LITE_ECT,
+            'reduced_ect': client_hints.REDUCED_ECT,
+            'lite_max_memory_gb': client_hints.LITE_MAX_MEMORY_GB,
+            'reduced_max_memory_gb': client_hints.REDUCED_MAX_MEMORY_GB,
+        },
+    }
+
+
+def _revalidated(response):
+    # Browsers must ask for a fresh worker/manifest every time; ETags keep that cheap
+    response.headers['Cache-Control'] = 'no-cache'
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+@app.route('/precache-manifest.json')
+def get_precache_manifest():
+    """Asset revisions, precached URLs and data version for the service worker"""
+    return _revalidated(app.json.response(precache_manifest()))
+
+
+@app.route('/sw.js')
+def get_service_worker():
+    """Service worker with the current precache manifest embedded"""
+    response = app.response_class(render_template('sw.js', manifest=precache_manifest()),
+                                  mimetype='application/javascript')
+    return _revalidated(response)
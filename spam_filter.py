@@ -0,0 +1,256 @@
+"""Spam scoring for contact form submissions.
+
+A multinomial naive Bayes model over hashed features. The features are words
+and word pairs of the subject and message, the sender's email domain, name
+tokens, and link/caps/length buckets. It is trained from ``Contact`` rows the
+owner has labelled:
+
+- ``status='spam'`` counts as spam
+- ``read``/``replied``/``archived`` count as legitimate
+
+The model's own verdicts are stored as ``held`` and never train it, so it
+cannot reinforce its mistakes. Confirming a held row as ``spam``, or moving
+it to ``read``, turns it into a label for the next training run.
+
+Training saves the per-feature log-likelihood ratios to ``SPAM_MODEL_PATH``.
+Workers reload the file when it changes (cron:
+``flask --app main train-spam-model``). Features are hashed in the request
+thread. The scoring itself runs on a small pool of threads that take
+whatever submissions are queued, up to ``SPAM_BATCH_SIZE``, and score them
+with one NumPy gather and reduce. A lone request is scored immediately, with
+no waiting for a batch to fill.
+
+Submissions scoring at or above ``SPAM_THRESHOLD`` are stored with
+``status='held'`` and never emailed. Until enough labelled rows exist, or if
+scoring fails, submissions pass through unscored.
+"""
+import os
+import queue
+import re
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+
+import click
+import numpy as np
+from sqlalchemy import select
+
+from app import app, db
+from models import Contact
+
+N_FEATURES = 1 << 18
+# Owner-set statuses only; 'held' (the model's verdict) is deliberately absent
+SPAM_LABELS = ('spam',)
+HAM_LABELS = ('read', 'replied', 'archived')
+SMOOTHING = 1.0
+SCORE_TIMEOUT = 0.5  # seconds; fail open rather than hold up a submission
+
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9'_-]*")
+_LINK_RE = re.compile(r'https?://|www\.', re.IGNORECASE)
+
+
+def _bucket(value, edges):
+    for i, edge in enumerate(edges):
+        if value < edge:
+            return i
+    return len(edges)
+
+
+def contact_features(name, email, subject, message):
+    """Hashed feature indices (with repeats) for one submission"""
+    name, email, subject, message = name or '', email or '', subject or '', message or ''
+    words = _WORD_RE.findall(f'{subject} {message}'.lower())
+    tokens = [f'w:{w}' for w in words]
+    tokens.extend(f'b:{a} {b}' for a, b in zip(words, words[1:]))
+    tokens.extend(f'n:{w}' for w in _WORD_RE.findall(name.lower()))
+
+    domain = email.rpartition('@')[2].lower()
+    tokens.append(f'd:{domain}')
+    tokens.append(f'tld:{domain.rpartition(".")[2]}')
+
+    letters = sum(c.isalpha() for c in message)
+    caps = sum(c.isupper() for c in message) / letters if letters else 0.0
+    tokens.append(f'links:{min(len(_LINK_RE.findall(message)), 5)}')
+    tokens.append(f'caps:{_bucket(caps, (0.05, 0.2, 0.5))}')
+    tokens.append(f'len:{_bucket(len(message), (20, 80, 300, 1000, 3000))}')  # always present
+
+    return np.fromiter((zlib.crc32(t.encode()) & (N_FEATURES - 1) for t in tokens),
+                       dtype=np.int64, count=len(tokens))
+
+
+class SpamModel:
+    """Per-feature log-likelihood ratios plus the class prior, as log odds"""
+
+    def __init__(self, llr, prior, spam_count=0, ham_count=0):
+        self.llr = llr
+        self.prior = prior
+        self.spam_count = spam_count
+        self.ham_count = ham_count
+
+    @classmethod
+    def train(cls, spam_docs, ham_docs):
+        def log_probs(docs):
+            counts = np.bincount(np.concatenate(docs), minlength=N_FEATURES).astype(np.float64)
+            return np.log((counts + SMOOTHING) / (counts.sum() + SMOOTHING * N_FEATURES))
+
+        llr = (log_probs(spam_docs) - log_probs(ham_docs)).astype(np.float32)
+        prior = float(np.log(len(spam_docs) / len(ham_docs)))
+        return cls(llr, prior, len(spam_docs), len(ham_docs))
+
+    def score_batch(self, docs):
+        """Spam probability for each feature array in ``docs``"""
+        offsets = np.zeros(len(docs), dtype=np.int64)
+        np.cumsum([len(d) for d in docs[:-1]], out=offsets[1:])
+        log_odds = np.add.reduceat(self.llr[np.concatenate(docs)], offsets) + self.prior
+        return 1.0 / (1.0 + np.exp(-np.clip(log_odds, -50, 50)))
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f'{path}.tmp.npz'
+        np.savez(tmp_path, llr=self.llr, prior=self.prior,
+                 counts=np.array([self.spam_count, self.ham_count]))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as stored:
+            spam_count, ham_count = stored['counts'].tolist()
+            return cls(stored['llr'], float(stored['prior']), spam_count, ham_count)
+
+
+def model_path():
+    return app.config['SPAM_MODEL_PATH'] or os.path.join(app.instance_path, 'spam_model.npz')
+
+
+def train_from_contacts():
+    """Train on labelled Contact rows; returns the model or None if there are too few labels"""
+    rows = db.session.execute(
+        select(Contact.name, Contact.email, Contact.subject, Contact.message, Contact.status)
+        .where(Contact.status.in_(SPAM_LABELS + HAM_LABELS))
+        .execution_options(yield_per=1000)
+    )
+    spam_docs, ham_docs = [], []
+    for row in rows:
+        features = contact_features(row.name, row.email, row.subject, row.message)
+        (spam_docs if row.status in SPAM_LABELS else ham_docs).append(features)
+
+    minimum = app.config['SPAM_MIN_EXAMPLES']
+    if len(spam_docs) < minimum or len(ham_docs) < minimum:
+        return None
+    return SpamModel.train(spam_docs, ham_docs)
+
+
+class ModelFile:
+    """The saved model, reloaded whenever the file on disk changes"""
+
+    def __init__(self):
+        self._model = None
+        self._stamp = None
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp != self._stamp:
+            with self._lock:
+                if stamp != self._stamp:
+                    self._model = SpamModel.load(path)
+                    self._stamp = stamp
+        return self._model
+
+
+class BatchScorer:
+    """Thread pool that scores queued submissions together in micro-batches"""
+
+    def __init__(self, threads, batch_size):
+        self.threads = threads
+        self.batch_size = batch_size
+        self._queue = queue.SimpleQueue()
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_threads(self):
+        # Threads do not survive fork; start the pool in each worker
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._queue = queue.SimpleQueue()
+                    for i in range(self.threads):
+                        threading.Thread(target=self._run, name=f'spam-scorer-{i}', daemon=True).start()
+                    self._pid = os.getpid()
+
+    def submit(self, model, features):
+        self._ensure_threads()
+        future = Future()
+        self._queue.put((model, features, future))
+        return future
+
+    def _run(self):
+        pending = self._queue
+        while True:
+            batch = [pending.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(pending.get_nowait())
+                except queue.Empty:
+                    break
+            # A model reload mid-batch is rare; score each model's items together
+            by_model = {}
+            for item in batch:
+                by_model.setdefault(id(item[0]), []).append(item)
+            for items in by_model.values():
+                try:
+                    scores = items[0][0].score_batch([features for _, features, _ in items])
+                except Exception as e:
+                    for _, _, future in items:
+                        future.set_exception(e)
+                    continue
+                for (_, _, future), score in zip(items, scores):
+                    future.set_result(float(score))
+
+
+model_file = ModelFile()
+scorer = BatchScorer(app.config['SPAM_SCORER_THREADS'], app.config['SPAM_BATCH_SIZE'])
+
+
+def spam_score(data):
+    """Probability that a submission is spam, or None when no model is available"""
+    if not app.config['SPAM_FILTER_ENABLED']:
+        return None
+    try:
+        model = model_file.get(model_path())
+        if model is None:
+            return None
+        features = contact_features(data.get('name'), data.get('email'), data.get('subject'), data.get('message'))
+        return scorer.submit(model, features).result(timeout=SCORE_TIMEOUT)
+    except Exception as e:
+        app.logger.warning(f'Spam scoring failed, accepting submission unscored: {e}')
+        return None
+
+
+def is_spam(score):
+    return score is not None and score >= app.config['SPAM_THRESHOLD']
+
+
+def train_and_save():
+    """Retrain from the inbox and save the model; returns it, or None if labels are lacking"""
+    model = train_from_contacts()
+    if model is not None:
+        model.save(model_path())
+    return model
+
+
+@app.cli.command('train-spam-model')
+def train_spam_model_command():
+    """Retrain the contact spam model from labelled inbox rows (for cron)."""
+    started = time.perf_counter()
+    model = train_and_save()
+    if model is None:
+        raise click.ClickException(
+            f'Need at least {app.config["SPAM_MIN_EXAMPLES"]} spam and legitimate labelled contacts')
+    click.echo(f'Trained on {model.spam_count} spam / {model.ham_count} legitimate contacts '
+               f'in {time.perf_counter() - started:.2f}s -> {model_path()}')
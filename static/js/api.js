@@ -56,6 +56,39 @@ class APIClient {
         }
     }
     
+    /**
+     * Stream a list endpoint as NDJSON, calling onRow for each row as it arrives.
+     * Bypasses the cache; resolves with the number of rows read.
+     */
+    async streamRows(endpoint, onRow) {
+        const separator = endpoint.includes('?') ? '&' : '?';
+        const response = await fetch(`${this.baseURL}${endpoint}${separator}format=ndjson`);
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+        }
+        
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffered = '';
+        let count = 0;
+        
+        for (;;) {
+            const { done, value } = await reader.read();
+            buffered += decoder.decode(value || new Uint8Array(), { stream: !done });
+            const lines = buffered.split('\n');
+            buffered = lines.pop();
+            for (const line of lines) {
+                if (line) {
+                    onRow(JSON.parse(line));
+                    count++;
+                }
+            }
+            if (done) {
+                return count;
+            }
+        }
+    }
+    
     /**
      * Get all projects with optional filtering
      */
@@ -89,11 +122,57 @@ class APIClient {
         return await this.request('/api/testimonials');
     }
     
+    /**
+     * Get testimonial locations for the map: { bbox: [minLon, minLat, maxLon, maxLat] },
+     * { near: [lat, lon], limit } or { zoom, bbox } for precomputed clusters
+     */
+    async getTestimonialGeo(query = {}) {
+        const params = new URLSearchParams();
+        
+        if (query.bbox) {
+            params.append('bbox', query.bbox.join(','));
+        }
+        if (query.near) {
+            params.append('near', query.near.join(','));
+        }
+        if (query.zoom !== undefined) {
+            params.append('zoom', query.zoom);
+        }
+        if (query.limit) {
+            params.append('limit', query.limit);
+        }
+        
+        return await this.request(`/api/testimonials/geo?${params.toString()}`);
+    }
+    
     /**
      * Get timeline items
      */
-    async getTimeline() {
-        return await this.request('/api/timeline');
+    async getTimeline(filters = {}) {
+        const params = new URLSearchParams();
+        
+        if (filters.category) {
+            params.append('category', filters.category);
+        }
+        if (filters.activeAt) {
+            params.append('active_at', filters.activeAt);
+        }
+        if (filters.from) {
+            params.append('from', filters.from);
+        }
+        if (filters.to) {
+            params.append('to', filters.to);
+        }
+        
+        const queryString = params.toString();
+        return await this.request(`/api/timeline${queryString ? `?${queryString}` : ''}`);
+    }
+    
+    /**
+     * Get total experience per timeline category
+     */
+    async getExperience() {
+        return await this.request('/api/timeline/experience');
     }
     
     /**
@@ -151,6 +230,73 @@ class APIClient {
             .substring(0, 1000); // Limit length
     }
     
+    /**
+     * Rows changed since a cursor from a previous call (omit it to get a starting cursor).
+     * Never cached: { cursor, reset, changes: { collection: { upserted, deleted } }, refetch }
+     */
+    async getChanges(since) {
+        const query = since === undefined ? '' : `?since=${encodeURIComponent(since)}`;
+        const response = await fetch(`${this.baseURL}/api/changes${query}`, { cache: 'no-store' });
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+        }
+        return await response.json();
+    }
+    
+    /**
+     * Drop cached responses for one collection endpoint, e.g. '/api/projects',
+     * along with views derived from it such as '/api/projects/...'
+     */
+    invalidate(endpoint) {
+        const prefix = `GET_${this.baseURL}${endpoint}`;
+        for (const key of this.cache.keys()) {
+            if (key.startsWith(`${prefix}_`) || key.startsWith(`${prefix}?`) || key.startsWith(`${prefix}/`)) {
+                this.cache.delete(key);
+            }
+        }
+    }
+    
+    /**
+     * Fold one collection's /api/changes delta ({ upserted, deleted }) into its cached
+     * responses. A response the delta cannot update exactly (a filter it cannot evaluate,
+     * a derived view, a stat it cannot match) is dropped and refetched on next use.
+     */
+    applyChanges(collection, { upserted, deleted }) {
+        const prefix = `GET_${this.baseURL}/api/${collection}`;
+        const merge = CHANGE_MERGERS[collection];
+        const now = Date.now();
+        for (const [key, cached] of [...this.cache]) {
+            if (key.startsWith(`${prefix}/`)) {
+                this.cache.delete(key);
+                continue;
+            }
+            if (!key.startsWith(`${prefix}_`) && !key.startsWith(`${prefix}?`)) {
+                continue;
+            }
+            // key is GET_<url>_<body>; a GET body is always '{}'
+            const params = new URL(key.slice('GET_'.length, key.lastIndexOf('_'))).searchParams;
+            const data = merge ? merge(cached.data, upserted, deleted, params) : null;
+            if (data) {
+                this.cache.set(key, { data, timestamp: now });
+            } else {
+                this.cache.delete(key);
+            }
+        }
+    }
+    
+    /**
+     * Mark cached responses for synced collections current. Called after each successful
+     * /api/changes poll, so they outlive cacheTimeout while the sync keeps them merged.
+     */
+    markSynced(collections) {
+        const now = Date.now();
+        for (const [key, cached] of this.cache) {
+            if (collections.some(collection => key.startsWith(`GET_${this.baseURL}/api/${collection}`))) {
+                cached.timestamp = now;
+            }
+        }
+    }
+    
     /**
      * Clear cache
      */
@@ -263,6 +409,94 @@ class APIClient {
     }
 }
 
+// ===== DELTA MERGING FOR /api/changes =====
+
+/**
+ * Insert row into rows (newest first by field), after any rows that tie with it
+ */
+function insertSorted(rows, row, field) {
+    const value = row[field] ?? '';
+    const index = rows.findIndex(existing => (existing[field] ?? '') < value);
+    rows.splice(index === -1 ? rows.length : index, 0, row);
+}
+
+/**
+ * Merger for a list payload ordered newest first by orderField. filterKeys are the query
+ * parameters the merger can evaluate as equality on the row field of the same name;
+ * responses with any other parameter are left for a refetch.
+ */
+function mergeList(orderField, filterKeys = []) {
+    return (rows, upserted, deleted, params) => {
+        for (const name of params.keys()) {
+            if (!filterKeys.includes(name)) {
+                return null;
+            }
+        }
+        const changed = new Set([...deleted, ...upserted.map(row => row.id)]);
+        const merged = rows.filter(row => !changed.has(row.id));
+        for (const row of upserted) {
+            if (filterKeys.every(name => !params.has(name) || String(row[name]) === params.get(name))) {
+                insertSorted(merged, row, orderField);
+            }
+        }
+        return merged;
+    };
+}
+
+/**
+ * Merger for a payload of rows grouped by category; delta rows carry their category
+ */
+function mergeGrouped(orderField) {
+    return (groups, upserted, deleted, params) => {
+        const changed = new Set([...deleted, ...upserted.map(row => row.id)]);
+        const merged = {};
+        for (const [category, rows] of Object.entries(groups)) {
+            const kept = rows.filter(row => !changed.has(row.id));
+            if (kept.length) {
+                merged[category] = kept;
+            }
+        }
+        for (const { category, ...row } of upserted) {
+            merged[category] = merged[category] || [];
+            if (orderField) {
+                insertSorted(merged[category], row, orderField);
+            } else {
+                merged[category].push(row);
+            }
+        }
+        return merged;
+    };
+}
+
+/**
+ * /api/stats rows have no id, so match on metric_name. Deletions and stats not already
+ * listed (new or renamed) cannot be placed exactly and force a refetch.
+ */
+function mergeStats(rows, upserted, deleted, params) {
+    if (deleted.length) {
+        return null;
+    }
+    const merged = rows.slice();
+    for (const { id, ...row } of upserted) {
+        const index = merged.findIndex(existing => existing.metric_name === row.metric_name);
+        if (index === -1) {
+            return null;
+        }
+        merged[index] = row;
+    }
+    return merged;
+}
+
+// collection -> merger(cachedData, upserted, deleted, queryParams) returning the new data or null
+const CHANGE_MERGERS = {
+    projects: mergeList('created_at', ['category', 'featured']),
+    testimonials: mergeList('created_at'),
+    timeline: mergeList('start_date', ['category']),
+    skills: mergeGrouped(null),
+    achievements: mergeGrouped('date_achieved'),
+    stats: mergeStats
+};
+
 // ===== REAL-TIME DATA UPDATES (if WebSocket support is added later) =====
 class RealtimeUpdates {
     constructor(apiClient) {
@@ -289,6 +523,50 @@ class RealtimeUpdates {
         }, interval);
     }
     
+    /**
+     * Poll /api/changes and notify 'changes' listeners with each non-empty delta.
+     * Changed rows are merged into the cached collections; only 'refetch' collections
+     * are dropped, and a 'reset' delta (the client fell too far behind) clears the cache.
+     */
+    startSync(interval = 30000) {
+        this.stopSync();
+        const poll = async () => {
+            try {
+                const delta = await this.apiClient.getChanges(this.cursor);
+                const first = this.cursor === undefined;
+                this.cursor = delta.cursor;
+                if (first) {
+                    return;  // the page just loaded its data; start from here
+                }
+                if (delta.reset) {
+                    this.apiClient.clearCache();
+                } else {
+                    for (const [collection, change] of Object.entries(delta.changes)) {
+                        this.apiClient.applyChanges(collection, change);
+                    }
+                    for (const collection of delta.refetch) {
+                        this.apiClient.invalidate(`/api/${collection}`);
+                    }
+                    this.apiClient.markSynced(Object.keys(CHANGE_MERGERS));
+                }
+                if (delta.reset || delta.refetch.length || Object.keys(delta.changes).length) {
+                    this.notifyListeners('changes', delta);
+                }
+            } catch (error) {
+                console.warn('Change sync failed:', error);
+            }
+        };
+        poll();
+        this.syncInterval = setInterval(poll, interval);
+    }
+    
+    stopSync() {
+        if (this.syncInterval) {
+            clearInterval(this.syncInterval);
+            this.syncInterval = null;
+        }
+    }
+    
     stopPolling() {
         if (this.pollingInterval) {
             clearInterval(this.pollingInterval);
@@ -332,6 +610,15 @@ class APIError extends Error {
     }
 }
 
+// ===== SERVICE WORKER (offline and instant repeat visits) =====
+if (typeof navigator !== 'undefined' && 'serviceWorker' in navigator) {
+    window.addEventListener('load', () => {
+        navigator.serviceWorker.register('/sw.js').catch(error => {
+            console.warn('Service worker registration failed:', error);
+        });
+    });
+}
+
 // ===== EXPORT FOR USE IN OTHER MODULES =====
 if (typeof module !== 'undefined' && module.exports) {
     module.exports = { APIClient, RealtimeUpdates, APIError };
@@ -8,7 +8,7 @@ class Dashboard3D {
         this.scenes = new Map();
         this.cameras = new Map();
         this.animationId = null;
-        this.clock = new THREE.Clock();
+        this.clock = typeof THREE !== 'undefined' ? new THREE.Clock() : null;  // lite pages ship without three.js
         this.currentTheme = 'dark';
         
         // Data storage
@@ -32,6 +32,7 @@ class Dashboard3D {
                 console.warn('Three.js not loaded, using fallback dashboard');
                 await this.loadData();
                 this.initializeFallbackWidgets();
+                this.initSync();
                 return;
             }
             
@@ -40,6 +41,7 @@ class Dashboard3D {
             this.initializeThemeSwitcher();
             this.initializeChat();
             this.startAnimationLoop();
+            this.initSync();
             
             console.log('Dashboard 3D initialized successfully');
         } catch (error) {
@@ -161,6 +163,47 @@ class Dashboard3D {
         }
     }
     
+    /**
+     * Poll /api/changes and fold each delta into the loaded data instead of reloading it
+     */
+    initSync() {
+        this.sync = new RealtimeUpdates(this.apiClient);
+        this.sync.subscribe('changes', delta => this.applyChanges(delta));
+        this.sync.startSync();
+    }
+    
+    async applyChanges(delta) {
+        // collection -> [data property, widget that renders it]
+        const views = {
+            projects: ['projectsData', () => this.populateProjectGallery()],
+            skills: ['skillsData', () => this.populateSkillsDisplay()],
+            testimonials: ['testimonialsData', () => this.populateTestimonials()],
+            timeline: ['timelineData', () => this.populateTimeline()],
+            stats: ['statsData', () => this.populateStats()],
+            achievements: ['achievementsData', () => this.populateAchievements()]
+        };
+        for (const [collection, [property, render]] of Object.entries(views)) {
+            const change = delta.changes[collection];
+            const refetch = delta.reset || delta.refetch.includes(collection);
+            if (!change && !refetch) {
+                continue;
+            }
+            // A merger returns null when the delta cannot be applied exactly
+            let data = refetch ? null :
+                CHANGE_MERGERS[collection](this[property], change.upserted, change.deleted, new URLSearchParams());
+            if (!data) {
+                try {
+                    data = await this.apiClient.request(`/api/${collection}`);
+                } catch (error) {
+                    console.warn(`Failed to refresh ${collection}:`, error);
+                    continue;
+                }
+            }
+            this[property] = data;
+            render();
+        }
+    }
+    
     /**
      * Initialize all dashboard widgets
      */
@@ -1552,7 +1595,10 @@ class Dashboard3D {
             
             card.innerHTML = `
                 <div style="display: flex; align-items: center; gap: 1rem; margin-bottom: 1rem;">
-                    <img src="${project.image_url}" alt="${project.title}" style="width: 48px; height: 48px; border-radius: 8px;">
+                    ${project.image_url ? 
+                        `<img src="${project.image_url}" alt="${project.title}" style="width: 48px; height: 48px; border-radius: 8px;">` : 
+                        ''
+                    }
                     <div>
                         <h3 style="margin: 0; color: var(--text-primary); font-size: 1.1rem;">${project.title}</h3>
                         <span style="color: var(--neon-cyan); font-size: 0.85rem;">${project.category}</span>
@@ -4,7 +4,9 @@
  */
 class GPUOptimizer {
     constructor() {
-        this.gpuTier = this.detectGPUTier();
+        // The server already picked the 'reduced' page from client hints; skip the WebGL probe
+        const reduced = document.documentElement.dataset.variant === 'reduced';
+        this.gpuTier = reduced ? 'low' : this.detectGPUTier();
         this.optimizedSettings = this.getOptimizedSettings();
     }
 
@@ -48,6 +48,9 @@ class PortfolioApp {
             // Load content
             await this.loadContent();
             
+            // Keep content current from /api/changes
+            this.initSync();
+            
             // Initialize interactions
             this.initInteractions();
             
@@ -416,6 +419,22 @@ class PortfolioApp {
         }
     }
     
+    /**
+     * Poll /api/changes; changed rows are merged into the API cache, so a re-render
+     * only downloads a collection again when the server asks for a refetch
+     */
+    initSync() {
+        this.sync = new RealtimeUpdates(this.api);
+        this.sync.subscribe('changes', async delta => {
+            if (delta.reset || delta.changes.projects || delta.refetch.includes('projects')) {
+                await this.loadProjects();
+                const activeFilter = document.querySelector('.filter-btn.active');
+                this.filterProjects(activeFilter ? activeFilter.getAttribute('data-filter') : 'all');
+            }
+        });
+        this.sync.startSync();
+    }
+    
     renderProjects(projects) {
         const projectsGrid = document.getElementById('projects-grid');
         if (!projectsGrid) return;
@@ -630,7 +649,6 @@ class PortfolioApp {
     
     initProjectFilters() {
         const filterButtons = document.querySelectorAll('.filter-btn');
-        const projectCards = document.querySelectorAll('.project-card');
         
         filterButtons.forEach(button => {
             button.addEventListener('click', () => {
@@ -640,26 +658,30 @@ class PortfolioApp {
                 filterButtons.forEach(btn => btn.classList.remove('active'));
                 button.classList.add('active');
                 
-                // Filter projects
-                projectCards.forEach(card => {
-                    const category = card.getAttribute('data-category');
-                    
-                    if (filter === 'all' || category === filter) {
-                        card.style.display = 'block';
-                        card.style.opacity = '1';
-                        card.style.transform = 'translateY(0) scale(1)';
-                    } else {
-                        card.style.opacity = '0';
-                        card.style.transform = 'translateY(20px) scale(0.8)';
-                        setTimeout(() => {
-                            card.style.display = 'none';
-                        }, 300);
-                    }
-                });
+                this.filterProjects(filter);
             });
         });
     }
     
+    filterProjects(filter) {
+        // Query the cards each time; a sync re-render replaces them
+        document.querySelectorAll('.project-card').forEach(card => {
+            const category = card.getAttribute('data-category');
+            
+            if (filter === 'all' || category === filter) {
+                card.style.display = 'block';
+                card.style.opacity = '1';
+                card.style.transform = 'translateY(0) scale(1)';
+            } else {
+                card.style.opacity = '0';
+                card.style.transform = 'translateY(20px) scale(0.8)';
+                setTimeout(() => {
+                    card.style.display = 'none';
+                }, 300);
+            }
+        });
+    }
+    
     initAchievementFilters() {
         const filterButtons = document.querySelectorAll('.achievement-filter-btn');
         const achievementCards = document.querySelectorAll('.achievement-item');
@@ -0,0 +1,104 @@
+// ===== SERVICE WORKER (generated by service_worker.py, do not edit the output) =====
+// Static assets: cache-first from a precache named after their revisions.
+// Pages and /api/* JSON: stale-while-revalidate, refreshed whenever the data version changes,
+// in one cache per client_hints.py variant so lite and full responses never mix.
+
+const MANIFEST = {{ manifest|tojson }};
+const ASSET_CACHE = `assets-${MANIFEST.assets_revision}`;
+const VARIANTS = ['lite', 'reduced', 'full'];
+const dataCacheName = variant => `data-v2-${variant}`;
+
+// The server's classification from what a worker can see (DPR is not exposed here).
+// Checked per request: Save-Data and the connection type change while the worker runs.
+function clientVariant() {
+    const connection = self.navigator.connection || {};
+    const memory = self.navigator.deviceMemory;
+    const thresholds = MANIFEST.variants;
+    if (connection.saveData || thresholds.lite_ect.includes(connection.effectiveType)
+            || (memory !== undefined && memory <= thresholds.lite_max_memory_gb)) {
+        return 'lite';
+    }
+    if (thresholds.reduced_ect.includes(connection.effectiveType)
+            || (memory !== undefined && memory <= thresholds.reduced_max_memory_gb)) {
+        return 'reduced';
+    }
+    return 'full';
+}
+
+self.addEventListener('install', event => {
+    event.waitUntil((async () => {
+        // Asset revisions only change on deploy; reuse an existing precache
+        if (!(await caches.has(ASSET_CACHE))) {
+            const assets = await caches.open(ASSET_CACHE);
+            // 'reload' bypasses the year-long HTTP cache on /static
+            await assets.addAll(MANIFEST.assets.map(asset => new Request(asset.url, { cache: 'reload' })));
+        }
+        const data = await caches.open(dataCacheName(clientVariant()));
+        await Promise.all(MANIFEST.data.map(url =>
+            fetch(url, { cache: 'no-store' })
+                .then(response => response.ok && data.put(url, response))
+                .catch(() => {})  // offline during install; keep whatever is cached
+        ));
+        await self.skipWaiting();
+    })());
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil((async () => {
+        const keep = new Set([ASSET_CACHE, ...VARIANTS.map(dataCacheName)]);
+        for (const name of await caches.keys()) {
+            if (!keep.has(name)) {
+                await caches.delete(name);
+            }
+        }
+        await self.clients.claim();
+    })());
+});
+
+async function cacheFirst(request) {
+    const cached = await caches.match(request, { cacheName: ASSET_CACHE, ignoreSearch: true });
+    if (cached) {
+        return cached;
+    }
+    const response = await fetch(request);
+    if (response.ok) {
+        const assets = await caches.open(ASSET_CACHE);
+        assets.put(request, response.clone());
+    }
+    return response;
+}
+
+async function staleWhileRevalidate(event, cacheKey) {
+    const data = await caches.open(dataCacheName(clientVariant()));
+    const cached = await data.match(cacheKey);
+    const refresh = fetch(event.request).then(response => {
+        if (response.ok) {
+            data.put(cacheKey, response.clone());
+        }
+        return response;
+    });
+    if (cached) {
+        event.waitUntil(refresh.catch(() => {}));
+        return cached;
+    }
+    return refresh;
+}
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    const url = new URL(request.url);
+
+    // Only same-origin, anonymous GETs; owner endpoints and writes go straight to the network
+    if (request.method !== 'GET' || url.origin !== self.location.origin || request.headers.has('Authorization')) {
+        return;
+    }
+    if (MANIFEST.network_only.some(prefix => url.pathname.startsWith(prefix))) {
+        return;
+    }
+
+    if (url.pathname.startsWith(MANIFEST.static_prefix)) {
+        event.respondWith(cacheFirst(request));
+    } else if (url.pathname.startsWith('/api/') || request.mode === 'navigate') {
+        event.respondWith(staleWhileRevalidate(event, url.pathname + url.search));
+    }
+});
@@ -0,0 +1,26 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Point the app at a throwaway database and instance files before it is imported
+_workdir = tempfile.mkdtemp(prefix='portfolio-tests-')
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(_workdir, "test.db")}'
+os.environ['DATA_VERSION_PATH'] = os.path.join(_workdir, 'data_version')
+os.environ['SPAM_MODEL_PATH'] = os.path.join(_workdir, 'spam_model.npz')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db  # noqa: E402
+
+
+@pytest.fixture
+def session():
+    with app.app_context():
+        yield db.session
+        db.session.rollback()
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
@@ -0,0 +1,37 @@
+"""Owner inbox API input validation."""
+import pytest
+
+from app import app
+
+TOKEN = 'test-admin-token'
+
+
+@pytest.fixture(autouse=True)
+def admin_token(monkeypatch):
+    monkeypatch.setitem(app.config, 'ADMIN_API_TOKEN', TOKEN)
+
+
+def _auth(token=TOKEN):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_non_ascii_token_is_unauthorized(client):
+    assert client.get('/api/contacts', headers=_auth('tökén')).status_code == 401
+
+
+@pytest.mark.parametrize('body', [
+    {'status': 'read', 'from_status': 'new', 'since': 123},
+    {'status': 'read', 'from_status': 'new', 'until': ['2025-01-01']},
+    {'status': 'read', 'from_status': 5},
+    {'status': 'read', 'from_status': [['new']]},
+    {'status': 'read', 'from_status': {'new': 1}},
+])
+def test_bad_status_update_bodies_are_rejected(client, body):
+    response = client.post('/api/contacts/status', json=body, headers=_auth())
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_valid_status_update(client):
+    response = client.post('/api/contacts/status', json={'status': 'read', 'from_status': ['new']}, headers=_auth())
+    assert response.status_code == 200
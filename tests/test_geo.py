@@ -0,0 +1,37 @@
+"""Regression tests for the testimonial map queries and cluster upkeep."""
+from sqlalchemy import func, select
+
+from geo import nearest_testimonials, rebuild_geo_index
+from models import GeoCluster, Testimonial
+
+
+def _clusters(session):
+    return sorted(session.execute(select(GeoCluster.precision, GeoCluster.cell, GeoCluster.count)).tuples())
+
+
+def test_nearest_returns_every_located_row_when_limit_exceeds_them(session):
+    located = session.scalar(select(func.count(Testimonial.id)).where(Testimonial.latitude.isnot(None)))
+    for latitude, longitude in ((40.7, -74.0), (89.9, 10.0), (0.0, 180.0)):
+        results = nearest_testimonials(latitude, longitude, located + 10)
+        assert len(results) == located
+        distances = [row['distance_km'] for row in results]
+        assert distances == sorted(distances)
+
+
+def test_nearest_endpoint_with_large_limit(session, client):
+    response = client.get('/api/testimonials/geo?near=40.7,-74&limit=100')
+    assert response.status_code == 200
+
+
+def test_clusters_follow_moves_of_expired_instances(session):
+    testimonial = Testimonial(name='Map Test', content='Moved', latitude=51.5, longitude=-0.12)
+    session.add(testimonial)
+    session.commit()
+    session.expire_all()
+    testimonial.latitude = -33.9
+    testimonial.longitude = 151.2
+    session.commit()
+
+    incremental = _clusters(session)
+    rebuild_geo_index()
+    assert incremental == _clusters(session)
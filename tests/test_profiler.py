@@ -0,0 +1,24 @@
+"""Signed X-Profile headers."""
+import time
+
+import pytest
+
+from profiler import profile_signature, verify_signature
+
+SECRET = 'profile-secret'
+
+
+def test_valid_signature_is_accepted():
+    header = profile_signature(SECRET, 'GET', '/api/projects')
+    assert verify_signature(SECRET, header, 'GET', '/api/projects')
+
+
+@pytest.mark.parametrize('header', [
+    '².abc',
+    '١٢٣.abc',
+    f'{int(time.time())}.sïgnature',
+    f'{int(time.time())}.' + 'é' * 64,
+    'not-a-timestamp',
+])
+def test_crafted_headers_are_rejected_without_raising(header):
+    assert verify_signature(SECRET, header, 'GET', '/api/projects') is False
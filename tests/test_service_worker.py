@@ -0,0 +1,22 @@
+"""The service worker only changes when public content or assets change."""
+from models import Project
+
+
+def test_contact_post_leaves_service_worker_unchanged(client):
+    etag = client.get('/sw.js').headers['ETag']
+    response = client.post('/api/contact', json={'name': 'Visitor', 'email': 'v@example.com', 'message': 'Hi'})
+    assert response.status_code == 200
+    assert client.get('/sw.js').headers['ETag'] == etag
+
+
+def test_content_write_changes_service_worker(client, session):
+    etag = client.get('/sw.js').headers['ETag']
+    session.get(Project, 1).title = 'Renamed project'
+    session.commit()
+    assert client.get('/sw.js').headers['ETag'] != etag
+
+
+def test_manifest_carries_variant_thresholds(client):
+    from client_hints import LITE_ECT
+    variants = client.get('/precache-manifest.json').get_json()['variants']
+    assert variants['lite_ect'] == list(LITE_ECT)